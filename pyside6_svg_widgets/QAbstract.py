@@ -1,6 +1,13 @@
 import os
 import re
-from functools import partial
+import sys
+import time
+import threading
+import mmap
+import struct
+import hashlib
+import weakref
+from collections import OrderedDict, Counter
 from typing import Optional, Union, Tuple
 import xml.etree.ElementTree as Et
 
@@ -9,56 +16,145 @@ from functools import lru_cache
 from PySide6.QtWidgets import (
     QPushButton, QWidget,
     QLabel, QHBoxLayout, QStyle, QStyleOption,
-    QSizePolicy, QSpacerItem, QRadioButton, QToolButton
+    QSizePolicy, QSpacerItem, QRadioButton, QToolButton,
+    QStyleOptionButton, QStyleOptionToolButton, QStylePainter,
+    QStyledItemDelegate, QStyleOptionViewItem, QApplication
 )
-from PySide6.QtGui import QPixmap, QPainter, QIcon, QColor
+from PySide6.QtGui import QPixmap, QPainter, QIcon, QColor, QPalette, QImage, QIconEngine
 from PySide6.QtSvg import QSvgRenderer
-from PySide6.QtCore import Qt, QTimer, QSize, Signal, QByteArray
+from PySide6.QtCore import (
+    Qt, QTimer, QSize, Signal, QByteArray, QEvent, QRect, QRectF,
+    QObject, QRunnable, QThreadPool, QPersistentModelIndex
+)
 from PySide6.QtSvgWidgets import QSvgWidget
 
 SIZE = 55
+ICON_CACHE_BYTES = 64 * 1024 * 1024
+MASK_CACHE_BYTES = 16 * 1024 * 1024
+# Rasterize SVGs this many times larger than displayed and scale down; 1 renders at the exact size.
+SUPERSAMPLING = 1
+# Default for new SVGRender*, QIconSvg and QSvgButton widgets: paint icons from shared atlas pages.
+ICON_ATLAS = False
+ATLAS_PAGE_SIZE = 1024
+ATLAS_MAX_PAGES = 4
+# Default for new SVGRender*, QIconSvg and QSvgButton widgets: rasterize icons on a thread pool.
+ASYNC_RENDER = False
+# Default for new SVGRender*, QIconSvg and QSvgButton widgets: one QIcon backed by SvgIconEngine for every state.
+ICON_ENGINE = False
+# apply hover/press icon changes at most once per frame of FRAME_INTERVAL ms
+HOVER_COALESCING = False
+FRAME_INTERVAL = 16
+# Default for new widgets: leave hidden and scrolled out widgets unrendered until they are shown or painted.
+LAZY_RENDER = False
+# Tick of the shared timer that advances animated SVGs in SVGRenderIcon and SVGRenderButton, in ms.
+ANIMATION_INTERVAL = 33
+# Directory with icons pre-rasterized by `python -m pyside6_svg_widgets.bake`, checked before rendering.
+BAKED_ICONS_DIR = None
+DISK_CACHE_BYTES = 256 * 1024 * 1024
+# Budget of the state icons widgets hold on to; over it the least recently shown ones are dropped.
+ICON_MEMORY_BYTES = 128 * 1024 * 1024
+ICON_SPACING = 4
+# SVG references of the form "bundle:name" are looked up in the bundles opened with load_bundle().
+BUNDLE_PREFIX = "bundle:"
+# Distinct SVG strings SvgSourcePool keeps normalized, the least recently used are dropped first.
+SVG_POOL_ENTRIES = 1024
+
+
+PSEUDO_STATES = ("hover", "checked", "pressed")
+# Properties the style cache resolves together, one parent walk serves both.
+STYLE_PROPERTIES = ("icon-color", "color")
+SELECTOR_TOKEN = re.compile(r"[#.]?([\w-]+)((?::{1,2}[\w-]+)*)")
+
+
+class StyleIndex:
+    """
+    Compiled form of a QSS string: (selector, pseudo-state) -> {property: value}.
+    Comment markers are ignored inside rules, so properties Qt does not know (icon-color)
+    can be hidden from Qt in a comment and still be picked up here.
+    """
+
+    def __init__(self, style_sheet: str):
+        self.rules = {}
+        for block in style_sheet.split('}'):
+            if '{' not in block:
+                continue
+
+            selectors, _, body = block.rpartition('{')
+            properties = self.parse_rules(body)
+            if not properties:
+                continue
+
+            for name, state in self.parse_selectors(selectors):
+                rule = self.rules.setdefault((name, state), {})
+                for key, value in properties.items():
+                    rule.setdefault(key, value)
+
+    @staticmethod
+    def parse_rules(body: str) -> dict:
+        properties = {}
+        body = body.replace("/*", "").replace("*/", "")
+        for declaration in body.split(';'):
+            key, sep, value = declaration.partition(':')
+            key, value = key.strip(), value.strip()
+            if sep and key and value:
+                properties.setdefault(key, value)
+        return properties
+
+    @staticmethod
+    def parse_selectors(selectors: str) -> set:
+        states = {}
+        selectors = selectors.replace("/*", " ").replace("*/", " ")
+        for name, pseudo in SELECTOR_TOKEN.findall(selectors):
+            state = pseudo.lstrip(':').split(':')[0] if pseudo else "normal"
+            states.setdefault(name, set()).add(state)
+
+        result = set()
+        for name, found in states.items():
+            # a block that styles a pseudo-state of the widget never counts as its normal style
+            if "normal" in found and found & set(PSEUDO_STATES):
+                found = found - {"normal"}
+            result.update((name, state) for state in found)
+        return result
+
+    def __contains__(self, name):
+        return (name, "normal") in self.rules or any((name, state) in self.rules for state in PSEUDO_STATES)
+
+    def properties(self, name: str, state: str = "normal") -> dict:
+        """Every property set for the selector in the given pseudo-state."""
+        return self.rules.get((name, state), {})
+
+    def value(self, name: str, state: str, style_filter: str = "icon-color") -> Optional[str]:
+        return self.properties(name, state).get(style_filter)
+
+    def values(self, style_filter: str = "icon-color") -> list:
+        """Every distinct value of the property in the stylesheet, in order of appearance."""
+        values = (rule.get(style_filter) for rule in self.rules.values())
+        return list(dict.fromkeys(value for value in values if value))
+
+
+@lru_cache(maxsize=64)
+def compile_style_sheet(style_sheet: str) -> StyleIndex:
+    return StyleIndex(style_sheet)
+
+
+def style_state(hover=False, pressed=False, checked=False) -> str:
+    if hover:
+        return "hover"
+    if checked:
+        return "checked"
+    if pressed:
+        return "pressed"
+    return "normal"
 
 
 @lru_cache()
 def get_color(object_name, style_sheet, hover=False, pressed=False, checked=False, style_filter="icon-color"):
-    style_blocks = style_sheet.split('}')
-    for block in style_blocks:
-
-        if not object_name:
-            continue
-
-        _filter = any(
-            [
-                (f'{object_name}:hover') in block.strip(),
-                (f'{object_name}:pressed' in block.strip()),
-                (f'{object_name}:checked' in block.strip()),
-            ]
-        )
-        if not any([hover, pressed, checked]) and object_name in block.strip() and not _filter:
-            style_rules = block.split('{')[-1].strip()
-
-        elif hover and f'{object_name}:hover' in block.strip():
-            style_rules = block.split('{')[-1].strip()
-
-        elif checked and f'{object_name}:checked' in block.strip():
-            style_rules = block.split('{')[-1].strip()
-
-        elif pressed and f'{object_name}:pressed' in block.strip():
-            style_rules = block.split('{')[-1].strip()
-
-        else:
-            continue
-
-        clear = lambda e: str(e).replace("/*", "").replace("*/", "")
-        style_string = "\n".join(
-            [clear(i).strip() for i in style_rules.split("\n") if clear(i).strip().startswith(style_filter)])
-
-        if style_string:
-            pattern = style_filter + r":\s*([^;]+);"
-            matches = re.findall(pattern, style_string)
-            _match = matches[0] if matches else None
-            return _match, style_sheet
+    if not object_name:
+        return None, None
 
+    value = compile_style_sheet(style_sheet).value(object_name, style_state(hover, pressed, checked), style_filter)
+    if value:
+        return value, style_sheet
     return None, None
 
 
@@ -69,8 +165,6 @@ def get_effective_style(init_widget: QWidget, hover=False, pressed=False, checke
     current_widget = init_widget
     while current_widget:
         try:
-            current_widget
-
             style_sheet = current_widget.styleSheet()
             if style_sheet and object_name in style_sheet:
                 x, y = get_color(object_name, style_sheet, hover, pressed, checked, style_filter)
@@ -85,41 +179,1663 @@ def get_effective_style(init_widget: QWidget, hover=False, pressed=False, checke
     return None, None
 
 
+def get_effective_properties(init_widget: QWidget, style_filters=STYLE_PROPERTIES,
+                             object_name: Optional[str] = None) -> dict:
+    """
+    Resolve several properties for every pseudo-state of a widget in a single walk over its parents,
+    as {style_filter: {state: value}}. The rules of object_name are looked up, the class name of the
+    widget by default.
+    """
+
+    object_name = object_name or type(init_widget).__name__
+    result = {style_filter: dict.fromkeys(("normal",) + PSEUDO_STATES) for style_filter in style_filters}
+    current_widget = init_widget
+    while current_widget and any(None in states.values() for states in result.values()):
+        try:
+            style_sheet = current_widget.styleSheet()
+            if style_sheet and object_name in style_sheet:
+                index = compile_style_sheet(style_sheet)
+                for state in ("normal",) + PSEUDO_STATES:
+                    properties = index.properties(object_name, state)
+                    for style_filter, states in result.items():
+                        if states[state] is None:
+                            states[state] = properties.get(style_filter)
+
+            current_widget = current_widget.parentWidget()
+
+        except RuntimeError:
+            break
+    return result
+
+
+STYLE_EVENTS = (QEvent.Type.StyleChange, QEvent.Type.ParentChange, QEvent.Type.PaletteChange)
+
+
+class StyleCache:
+    """
+    Per-widget cache of resolved style values (icon-color, color) for every pseudo-state.
+    An entry is dropped when the widget receives StyleChange, ParentChange or PaletteChange.
+    Qt propagates StyleChange and PaletteChange to the children of a widget whose stylesheet,
+    palette or parent changes, so ancestor changes reach the cached widgets as well.
+    """
+
+    def __init__(self):
+        self._widgets = weakref.WeakKeyDictionary()
+
+    def __len__(self):
+        return len(self._widgets)
+
+    def states(self, widget: QWidget, style_filter="icon-color", object_name: Optional[str] = None) -> dict:
+        entry = self._widgets.get(widget)
+        if entry is None:
+            entry = self._widgets[widget] = {}
+
+        properties = entry.setdefault(object_name or type(widget).__name__, {})
+        if style_filter not in properties:
+            style_filters = STYLE_PROPERTIES if style_filter in STYLE_PROPERTIES else (style_filter,)
+            properties.update(get_effective_properties(widget, style_filters, object_name))
+        return properties[style_filter]
+
+    def get(self, widget: QWidget, hover=False, pressed=False, checked=False, style_filter="icon-color"):
+        return self.states(widget, style_filter)[style_state(hover, pressed, checked)]
+
+    def invalidate(self, widget: Optional[QWidget] = None):
+        if widget is None:
+            self._widgets.clear()
+        else:
+            self._widgets.pop(widget, None)
+
+    def handleEvent(self, widget: QWidget, event) -> bool:
+        """Drop the entry of the widget if the event can change its style."""
+        if event.type() in STYLE_EVENTS:
+            self.invalidate(widget)
+            return True
+        return False
+
+
+style_cache = StyleCache()
+
+
+class ThemeCoordinator:
+    """
+    Batches the icon refresh after a theme switch. Widgets hit by a style, palette or parent
+    change only register here; once the events are delivered every registered widget re-renders
+    its icon in one pass. With batch_size set, the pass is spread over several event loop
+    iterations, batch_size widgets each.
+    """
+
+    def __init__(self, batch_size: Optional[int] = None):
+        self.batch_size = batch_size
+        self.pending = weakref.WeakKeyDictionary()
+        self.scheduled = False
+
+    def __len__(self):
+        return len(self.pending)
+
+    def setBatchSize(self, batch_size: Optional[int]):
+        self.batch_size = batch_size
+
+    def schedule(self, widget: QWidget):
+        if widget in polish_scheduler:
+            # not shown yet, its icon is resolved before the first paint anyway
+            return
+
+        self.pending[widget] = None
+        if not self.scheduled:
+            self.scheduled = True
+            QTimer.singleShot(0, self.flush)
+
+    def flush(self):
+        self.scheduled = False
+        widgets = list(self.pending.keys())
+        if self.batch_size:
+            widgets = widgets[:self.batch_size]
+
+        for widget in widgets:
+            self.pending.pop(widget, None)
+            try:
+                widget.refreshIcon()
+            except RuntimeError:
+                # deleted before its turn came
+                pass
+
+        if len(self.pending):
+            self.scheduled = True
+            QTimer.singleShot(0, self.flush)
+
+
+theme_coordinator = ThemeCoordinator()
+
+
+LAZY_EVENTS = (QEvent.Type.Show, QEvent.Type.Paint)
+
+
+class PolishScheduler:
+    """
+    Resolves the style and icon of new or changed widgets in one pass before they are painted.
+
+    Widgets register themselves when their SVG is set. A widget that is not visible yet waits for
+    its Show event, which then resolves every registered widget of the same window at once. Show
+    comes after the whole window is polished, so the palette and style changes of polishing are
+    over by then, and before the first paint. Widgets that are already visible are resolved on the
+    next event loop iteration.
+
+    Widgets in lazy render mode that are hidden or scrolled out of sight are deferred instead and
+    resolved one by one on their own Show or Paint event, so a theme switch renders only what is
+    on screen.
+    """
+
+    def __init__(self):
+        self.pending = weakref.WeakKeyDictionary()
+        self.deferred = weakref.WeakKeyDictionary()
+        self.scheduled = False
+
+    def __len__(self):
+        return len(self.pending) + len(self.deferred)
+
+    def __contains__(self, widget):
+        return widget in self.pending or widget in self.deferred
+
+    def schedule(self, widget: QWidget):
+        self.pending[widget] = None
+        if widget.isVisible() and not self.scheduled:
+            self.scheduled = True
+            QTimer.singleShot(0, self.flush)
+
+    def defer(self, widget: QWidget) -> bool:
+        """Keep a widget that is hidden or has no visible region for later, True if it was kept."""
+        if widget.isVisible() and not widget.visibleRegion().isEmpty():
+            self.deferred.pop(widget, None)
+            return False
+
+        self.deferred[widget] = None
+        return True
+
+    def handleEvent(self, widget: QWidget, e: QEvent):
+        if self.deferred and e.type() in LAZY_EVENTS and self.deferred.pop(widget, False) is None:
+            widget.refreshIcon()
+        if e.type() == QEvent.Type.Show and widget in self.pending:
+            window = widget.window()
+            self.resolve(lambda w: w.window() is window)
+
+    def flush(self):
+        self.scheduled = False
+        self.resolve(QWidget.isVisible)
+
+    def resolve(self, predicate):
+        for widget in list(self.pending.keys()):
+            try:
+                if predicate(widget) and self.pending.pop(widget, False) is None:
+                    widget.refreshIcon()
+            except RuntimeError:
+                # deleted before it was shown
+                self.pending.pop(widget, None)
+
+
+polish_scheduler = PolishScheduler()
+
+
+class StateCoalescer:
+    """
+    Applies the icon state of widgets in hover coalescing mode at most once per frame.
+    A widget records its new state right away and registers here, the states it passed through
+    before the frame is due are never rendered. A sweep across a toolbar thus costs one update
+    per button that ends up looking different, not one per enter and leave.
+    """
+
+    def __init__(self, interval: int = FRAME_INTERVAL):
+        self.interval = interval
+        self.pending = weakref.WeakKeyDictionary()
+        self.scheduled = False
+
+    def __len__(self):
+        return len(self.pending)
+
+    def schedule(self, widget: QWidget):
+        self.pending[widget] = None
+        if not self.scheduled:
+            self.scheduled = True
+            QTimer.singleShot(self.interval, self.flush)
+
+    def flush(self):
+        self.scheduled = False
+        widgets = list(self.pending.keys())
+        self.pending.clear()
+        for widget in widgets:
+            try:
+                widget.applyState()
+            except RuntimeError:
+                # deleted before the frame was due
+                pass
+
+
+state_coalescer = StateCoalescer()
+
+
+# BOM, whitespace, XML declaration, processing instructions, comments and doctype ahead of the root element
+SVG_PROLOG = re.compile(r"""(?:\ufeff|\s+|<\?.*?\?>|<!--.*?-->|<!DOCTYPE(?:[^\[>]|\[.*?\])*>)*""", re.S)
+SVG_ROOT = re.compile(r"""<svg\b(?:[^>"']|"[^"]*"|'[^']*')*>""")
+SVG_ATTRIBUTE = re.compile(r"""\s([\w:.-]+)\s*=\s*("[^"]*"|'[^']*')""")
+SVG_LENGTH = re.compile(r"\s*(\d+(?:\.\d*)?|\.\d+)\s*(?:px)?\s*")
+
+
+def is_svg_markup(svg: str) -> bool:
+    """True for an SVG string, False for a path to an SVG file."""
+    return svg.lstrip().startswith("<")
+
+
+def normalize_svg(svg: str) -> str:
+    """
+    Set the intrinsic size of the root element of an SVG string to SIZE x SIZE.
+    Only the width and height attributes of the root <svg> tag are rewritten, and only when both
+    are plain lengths. Without a viewBox, one spanning the old size is added so the drawing is
+    scaled instead of cropped. An <svg> tag inside the prolog, in a comment say, is not the root.
+    """
+    root = SVG_ROOT.match(svg, SVG_PROLOG.match(svg).end())
+    if root is None:
+        return svg
+
+    tag = root.group(0)
+    attributes = {match.group(1): match for match in SVG_ATTRIBUTE.finditer(tag)}
+    if "width" not in attributes or "height" not in attributes:
+        return svg
+
+    width = SVG_LENGTH.fullmatch(attributes["width"].group(2)[1:-1])
+    height = SVG_LENGTH.fullmatch(attributes["height"].group(2)[1:-1])
+    if width is None or height is None:
+        return svg
+
+    size = f' width="{SIZE}" height="{SIZE}"'
+    if "viewBox" not in attributes:
+        size += f' viewBox="0 0 {width.group(1)} {height.group(1)}"'
+
+    kept = sorted((attributes["width"].span(), attributes["height"].span()))
+    tag = tag[:kept[0][0]] + tag[kept[0][1]:kept[1][0]] + tag[kept[1][1]:]
+    tag = tag[:4] + size + tag[4:]
+    return svg[:root.start()] + tag + svg[root.end():]
+
+
+class SvgSourcePool:
+    """
+    Normalized SVG strings interned by content hash. Each distinct SVG string is normalized once,
+    widgets setting an equal string share one str object and one QByteArray of it, and the caches
+    keyed by that string see a single key. File paths pass through unchanged.
+    digest() is the one content hash of an SVG, the same for a file and for its markup.
+    At most max_entries strings are kept, the least recently used are dropped.
+    """
+
+    def __init__(self, max_entries: int = SVG_POOL_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        # render threads look up digests too
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def content_hash(svg: str) -> bytes:
+        return hashlib.sha1(svg.encode('utf-8')).digest()
+
+    def entry(self, svg: str, normalized: bool = False) -> Tuple[str, QByteArray, str]:
+        """
+        The normalized string, its UTF-8 bytes and their hex digest.
+        With normalized=True the string is taken as already normalized, as in a NORMALIZED bundle.
+        """
+        key = self.content_hash(svg)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+
+            text = svg if normalized else normalize_svg(svg)
+            text_key = key if text is svg else self.content_hash(text)
+            entry = self._entries.get(text_key)
+            if entry is None:
+                entry = text, QByteArray(text.encode('utf-8')), text_key.hex()
+            else:
+                self._entries.move_to_end(text_key)
+            self._entries[text_key] = entry
+            self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    @staticmethod
+    def resolve(svg: str) -> Tuple[str, bool]:
+        """The SVG string of a bundle:name reference and whether it is stored normalized, other SVGs unchanged."""
+        if svg.startswith(BUNDLE_PREFIX):
+            return bundle_svg(svg)
+        return svg, False
+
+    def intern(self, svg: Optional[str]) -> Optional[str]:
+        """
+        The shared normalized string for an SVG string or a bundle:name reference,
+        a path or None unchanged.
+        """
+        if not svg:
+            return svg
+        svg, normalized = self.resolve(svg)
+        if not is_svg_markup(svg):
+            return svg
+        return self.entry(svg, normalized)[0]
+
+    def source(self, svg: str) -> Union[str, QByteArray]:
+        svg, normalized = self.resolve(svg)
+        if not is_svg_markup(svg):
+            return svg
+        return self.entry(svg, normalized)[1]
+
+    def digest(self, svg: str) -> str:
+        """Hash of the normalized content of an SVG string, bundle:name reference or SVG file."""
+        svg, normalized = self.resolve(svg)
+        if is_svg_markup(svg):
+            return self.entry(svg, normalized)[2]
+        try:
+            with open(svg, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return hashlib.sha1(svg.encode('utf-8')).hexdigest()
+        try:
+            return self.entry(data.decode('utf-8'))[2]
+        except UnicodeDecodeError:
+            return hashlib.sha1(data).hexdigest()
+
+
+svg_pool = SvgSourcePool()
+
+
+def svg_source(svg: str) -> Union[str, QByteArray]:
+    """What QSvgRenderer loads for an SVG: the file path, or the normalized bytes of an SVG string."""
+    return svg_pool.source(svg)
+
+
+class SvgBundle:
+    """
+    Many SVGs packed into one read-only, memory-mapped file and looked up by name.
+
+    The file is a header, an index of fixed size entries sorted by name, the names and the SVG data.
+    Lookups binary search the mapped index, so opening a bundle reads nothing but the header.
+    Bundles written with normalize=True hold the SVGs already normalized by normalize_svg.
+    """
+    MAGIC = b"SVGBUNDL"
+    VERSION = 1
+    HEADER = struct.Struct("<8sIII")
+    ENTRY = struct.Struct("<IIII")
+    NORMALIZED = 1
+
+    def __init__(self, path: str):
+        self.path = path
+        self._svgs = {}
+        self._map = None
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, self.flags, self.count = self.HEADER.unpack_from(self._map, 0)
+        except (ValueError, struct.error):
+            magic = version = None
+        if magic != self.MAGIC or version != self.VERSION:
+            self.close()
+            raise ValueError(f"{path} is not an SVG bundle of version {self.VERSION}")
+        self.normalized = bool(self.flags & self.NORMALIZED)
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, name: str):
+        return self.find(name) is not None
+
+    def entry(self, position: int) -> tuple:
+        return self.ENTRY.unpack_from(self._map, self.HEADER.size + position * self.ENTRY.size)
+
+    def name(self, position: int) -> bytes:
+        name_offset, name_size, _, _ = self.entry(position)
+        return self._map[name_offset:name_offset + name_size]
+
+    def names(self) -> list:
+        return [self.name(position).decode("utf-8") for position in range(self.count)]
+
+    def find(self, name: str) -> Optional[tuple]:
+        """The (offset, size) of the SVG data, or None."""
+        key = name.encode("utf-8")
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self.name(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.count and self.name(low) == key:
+            return self.entry(low)[2:]
+        return None
+
+    def get(self, name: str) -> Optional[str]:
+        svg = self._svgs.get(name)
+        if svg is None:
+            found = self.find(name)
+            if found is None:
+                return None
+            offset, size = found
+            svg = self._svgs[name] = self._map[offset:offset + size].decode("utf-8")
+        return svg
+
+    def close(self):
+        self._svgs.clear()
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    @classmethod
+    def write(cls, path: str, svgs: dict, normalize: bool = False) -> int:
+        """Pack {name: SVG string} into a bundle at path. Returns the number of SVGs."""
+        items = sorted((name.encode("utf-8"), (normalize_svg(svg) if normalize else svg).encode("utf-8"))
+                       for name, svg in svgs.items())
+        names_offset = cls.HEADER.size + len(items) * cls.ENTRY.size
+        data_offset = names_offset + sum(len(name) for name, _ in items)
+
+        index, names, data = [], [], []
+        for name, svg in items:
+            index.append(cls.ENTRY.pack(names_offset, len(name), data_offset, len(svg)))
+            names.append(name)
+            data.append(svg)
+            names_offset += len(name)
+            data_offset += len(svg)
+
+        temp_path = path + ".tmp"
+        with open(temp_path, "wb") as f:
+            f.write(cls.HEADER.pack(cls.MAGIC, cls.VERSION, cls.NORMALIZED if normalize else 0, len(items)))
+            f.write(b"".join(index))
+            f.write(b"".join(names))
+            f.write(b"".join(data))
+        os.replace(temp_path, path)
+        return len(items)
+
+
+svg_bundles = []
+
+
+def load_bundle(path: str) -> SvgBundle:
+    """Open an SVG bundle, so widgets accept "bundle:name" for its SVGs. Earlier bundles win on equal names."""
+    bundle = SvgBundle(path)
+    svg_bundles.append(bundle)
+    return bundle
+
+
+def unload_bundles():
+    while svg_bundles:
+        svg_bundles.pop().close()
+
+
+def bundle_svg(reference: str) -> Tuple[str, bool]:
+    """
+    The SVG string of a "bundle:name" reference and whether its bundle holds it normalized.
+    Raises KeyError if no open bundle has the name.
+    """
+    name = reference[len(BUNDLE_PREFIX):]
+    for bundle in svg_bundles:
+        svg = bundle.get(name)
+        if svg is not None:
+            return svg, bundle.normalized
+    raise KeyError(f"No open SVG bundle has {name!r}")
+
+
+class SvgRendererRegistry:
+    """
+    Parses each distinct SVG path or string once and hands out the shared QSvgRenderer.
+    Renderers are held weakly: widgets keep the renderer they use alive, and it is dropped
+    once no widget references it any more.
+    """
+
+    def __init__(self):
+        self._renderers = weakref.WeakValueDictionary()
+
+    def __len__(self):
+        return len(self._renderers)
+
+    def __contains__(self, svg):
+        return svg in self._renderers
+
+    def get(self, svg: str) -> QSvgRenderer:
+        renderer = self._renderers.get(svg)
+        if renderer is None:
+            renderer = self.create(svg)
+            self._renderers[svg] = renderer
+        return renderer
+
+    @staticmethod
+    def create(svg: str) -> QSvgRenderer:
+        return QSvgRenderer(svg_source(svg))
+
+
+renderer_registry = SvgRendererRegistry()
+
+
+def paint_svg(
+        painter: QPainter,
+        rect: QRectF,
+        svg: str,
+        color: Optional[Union[QColor, str]],
+        keep_aspect: bool = False,
+        renderer: Optional[QSvgRenderer] = None
+):
+    """Rasterize an SVG into rect of the paint device and fill it with a single color, if one is given."""
+    renderer = renderer or renderer_registry.get(svg)
+    renderer.setAspectRatioMode(Qt.KeepAspectRatio if keep_aspect else Qt.IgnoreAspectRatio)
+
+    painter.save()
+    painter.setClipRect(rect)
+    painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+    painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_Source)
+    painter.fillRect(rect, Qt.GlobalColor.transparent)
+    painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_SourceOver)
+    renderer.render(painter, rect)
+    if color is not None:
+        painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_SourceIn)
+        painter.fillRect(rect, QColor(color))
+    painter.restore()
+
+
+def render_svg_mask(
+        svg: str,
+        width: int,
+        height: int,
+        dpr: float = 1.0,
+        keep_aspect: bool = False,
+        supersample: Optional[int] = None,
+        renderer: Optional[QSvgRenderer] = None
+) -> QImage:
+    """
+    Rasterize an SVG into a Format_Alpha8 coverage mask of width * dpr x height * dpr device pixels.
+    With supersample > 1 the SVG is rasterized that many times larger and scaled down afterwards.
+    """
+    supersample = max(1, SUPERSAMPLING if supersample is None else supersample)
+    device_width, device_height = max(1, round(width * dpr)), max(1, round(height * dpr))
+
+    image = QImage(device_width * supersample, device_height * supersample, QImage.Format.Format_ARGB32_Premultiplied)
+    image.fill(Qt.GlobalColor.transparent)
+    painter = QPainter(image)
+    paint_svg(painter, QRectF(image.rect()), svg, None, keep_aspect, renderer)
+    painter.end()
+
+    if supersample > 1:
+        image = image.scaled(device_width, device_height, Qt.AspectRatioMode.IgnoreAspectRatio,
+                             Qt.TransformationMode.SmoothTransformation)
+    mask = image.convertToFormat(QImage.Format.Format_Alpha8)
+    mask.setDevicePixelRatio(dpr)
+    return mask
+
+
+def colorize_mask(mask: QImage, color: Union[QColor, str]) -> QImage:
+    """
+    Fill a coverage mask with one color, into a premultiplied ARGB32 image with the dpr of the mask.
+    The raster engine composites Alpha8 with SIMD code, the SVG itself is not touched.
+    """
+    image = QImage(mask.width(), mask.height(), QImage.Format.Format_ARGB32_Premultiplied)
+    image.setDevicePixelRatio(mask.devicePixelRatio())
+    image.fill(QColor(color))
+    painter = QPainter(image)
+    painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_DestinationIn)
+    painter.drawImage(0, 0, mask)
+    painter.end()
+    return image
+
+
 def svg_to_pixmap(
         svg_filename: str,
         width: int,
         height: int,
-        color: Union[QColor, str]
+        color: Union[QColor, str],
+        dpr: float = 1.0,
+        keep_aspect: bool = False,
+        supersample: Optional[int] = None
 ) -> QPixmap:
-    if svg_filename.startswith("<svg"):
-        if "width=" in svg_filename and "height=" in svg_filename:
-            w = svg_filename.split("width=\"")[1].split('"')[0]
-            _width = f'width="{w}"'
-            h = svg_filename.split("height=\"")[1].split('"')[0]
-            _height = f'height="{h}"'
-            svg_filename = (svg_filename.
-                            replace(_width, f'width="{SIZE}"').
-                            replace(_height, f'height="{SIZE}"'))
-
-        svg_bytes = svg_filename.encode('utf-8')
-        svg_filename = QByteArray(svg_bytes)
-
-    if not isinstance(color, QColor):
+    """
+    Render an SVG filled with a single color at width x height logical pixels.
+    The pixmap holds width * dpr x height * dpr device pixels and carries the dpr, so it is
+    painted without rescaling. The color is filled into the cached coverage mask of the SVG,
+    other colors of the same SVG and size do not rasterize it again.
+    """
+    return QPixmap.fromImage(colorize_mask(svg_mask(svg_filename, width, height, dpr, keep_aspect, supersample), color))
+
+
+@lru_cache(maxsize=1024)
+def svg_digest(svg: str) -> str:
+    """
+    Content hash of an SVG string or of the file an SVG path points to, taken after normalization
+    so a file, its markup and a bundle entry of it share the cached and baked icons.
+    """
+    return svg_pool.digest(svg)
+
+
+class IconCache:
+    """Process-wide LRU cache of rendered icon pixmaps bounded by a byte budget."""
+
+    def __init__(self, max_bytes: int = ICON_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        # cacheKey() of every cached pixmap to its key, so holders can drop a pixmap they let go of
+        self._keys = {}
+
+    def __len__(self):
+        return len(self._items)
+
+    @staticmethod
+    def pixmap_bytes(pixmap: QPixmap) -> int:
+        return pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) // 8
+
+    def get(self, key) -> Optional[QPixmap]:
+        pixmap = self._items.get(key)
+        if pixmap is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._items.move_to_end(key)
+        return pixmap
+
+    def put(self, key, pixmap: QPixmap):
+        if key in self._items:
+            self.pop(key)
+
+        size = self.pixmap_bytes(pixmap)
+        if size > self.max_bytes:
+            return
+
+        self._items[key] = pixmap
+        self._keys[pixmap.cacheKey()] = key
+        self.bytes += size
+        self.evict()
+
+    def pop(self, key) -> Optional[QPixmap]:
+        pixmap = self._items.pop(key, None)
+        if pixmap is not None:
+            self._keys.pop(pixmap.cacheKey(), None)
+            self.bytes -= self.pixmap_bytes(pixmap)
+        return pixmap
+
+    def holds(self, cache_key: int) -> bool:
+        return cache_key in self._keys
+
+    def discard(self, cache_key: int):
+        """Drop the pixmap with this cacheKey(), if it is cached."""
+        key = self._keys.get(cache_key)
+        if key is not None:
+            self.pop(key)
+
+    def evict(self):
+        while self.bytes > self.max_bytes and self._items:
+            self.pop(next(iter(self._items)))
+
+    def setMaxBytes(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.evict()
+
+    def clear(self):
+        self._items.clear()
+        self._keys.clear()
+        self.bytes = 0
+
+
+icon_cache = IconCache()
+# coverage masks are QImages, IconCache only needs their size and depth
+mask_cache = IconCache(MASK_CACHE_BYTES)
+# the render pool threads share mask_cache with the GUI thread
+mask_cache_lock = threading.Lock()
+
+
+def svg_mask(
+        svg: str,
+        width: int,
+        height: int,
+        dpr: float = 1.0,
+        keep_aspect: bool = False,
+        supersample: Optional[int] = None,
+        own_renderer: bool = False
+) -> QImage:
+    """
+    The coverage mask of the SVG at this size from the shared mask cache, rasterized on a miss.
+    With own_renderer a miss is rasterized by a QSvgRenderer of its own instead of the shared one,
+    which makes the call safe outside the GUI thread.
+    """
+    supersample = max(1, SUPERSAMPLING if supersample is None else supersample)
+    key = svg_digest(svg), width, height, dpr, keep_aspect, supersample
+    with mask_cache_lock:
+        mask = mask_cache.get(key)
+    if mask is None:
+        renderer = QSvgRenderer(svg_source(svg)) if own_renderer else None
+        mask = render_svg_mask(svg, width, height, dpr, keep_aspect, supersample, renderer)
+        with mask_cache_lock:
+            mask_cache.put(key, mask)
+    return mask
+
+
+def icon_key(svg: str, width: int, height: int, color: Union[QColor, str], dpr: float = 1.0,
+             keep_aspect: bool = False) -> tuple:
+    return svg_digest(svg), width, height, QColor(color).rgba(), dpr, keep_aspect, SUPERSAMPLING
+
+
+def icon_key_name(key: tuple) -> str:
+    digest, width, height, rgba, dpr, keep_aspect, supersample = key
+    return f"{digest}-{width}x{height}-{rgba:08x}-{dpr:g}-{int(keep_aspect)}-{supersample}"
+
+
+def baked_icon_name(key: tuple) -> str:
+    return icon_key_name(key) + ".png"
+
+
+def load_baked_pixmap(key: tuple) -> Optional[QPixmap]:
+    if not BAKED_ICONS_DIR:
+        return None
+
+    path = os.path.join(BAKED_ICONS_DIR, baked_icon_name(key))
+    if not os.path.exists(path):
+        return None
+
+    pixmap = QPixmap(path)
+    if pixmap.isNull():
+        return None
+    pixmap.setDevicePixelRatio(key[4])
+    return pixmap
+
+
+class DiskIconCache:
+    """
+    Persistent raster cache in a single memory-mapped file.
+
+    The file is a header followed by records appended one after another; each record holds its
+    key and the raw premultiplied ARGB32 pixels, so a hit builds a QImage right on the mapped bytes.
+    The index (key -> record offset) is rebuilt from the record headers when the file is opened.
+    A file with another format version is discarded. When the file grows over max_bytes it is
+    rewritten with the most recently used records only.
+    """
+    MAGIC = b"SVGICONS"
+    VERSION = 1
+    HEADER = struct.Struct("<8sII")
+    RECORD = struct.Struct("<4sIIIIdI")
+    RECORD_MAGIC = b"ICON"
+
+    def __init__(self, path: str, max_bytes: int = DISK_CACHE_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.index = OrderedDict()
+        self._file = None
+        self._map = None
+        self.open()
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, key):
+        return icon_key_name(key) in self.index
+
+    @property
+    def size(self) -> int:
+        return self._file.seek(0, os.SEEK_END)
+
+    def open(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._file = open(self.path, "a+b")
+        self._file.seek(0)
+        header = self._file.read(self.HEADER.size)
+        if header != self.HEADER.pack(self.MAGIC, self.VERSION, 0):
+            self._file.truncate(0)
+            self._file.write(self.HEADER.pack(self.MAGIC, self.VERSION, 0))
+            self._file.flush()
+        self.remap()
+        self.scan()
+
+    def close(self):
+        self.index.clear()
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def remap(self):
+        if self._map is not None:
+            self._map.close()
+        self._file.flush()
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def scan(self):
+        self.index.clear()
+        offset, end = self.HEADER.size, len(self._map)
+        while offset + self.RECORD.size <= end:
+            magic, key_size, width, height, bytes_per_line, dpr, data_size = self.RECORD.unpack_from(self._map, offset)
+            key_offset = offset + self.RECORD.size
+            data_offset = key_offset + self.padded(key_size)
+            if magic != self.RECORD_MAGIC or data_offset + data_size > end:
+                break
+
+            name = bytes(self._map[key_offset:key_offset + key_size]).decode("ascii")
+            self.index[name] = (data_offset, width, height, bytes_per_line, dpr, data_size)
+            self.index.move_to_end(name)
+            offset = data_offset + data_size
+
+        if offset != end:
+            # drop a record cut short by a crash while it was written
+            self._file.truncate(offset)
+            self.remap()
+
+    @staticmethod
+    def padded(size: int) -> int:
+        # keeps pixel data 32-bit aligned, as QImage requires
+        return (size + 3) & ~3
+
+    def get(self, key) -> Optional[QImage]:
+        """A copy of the cached image, or None."""
+        name = icon_key_name(key)
+        entry = self.index.get(name)
+        if entry is None:
+            return None
+
+        self.index.move_to_end(name)
+        offset, width, height, bytes_per_line, dpr, data_size = entry
+        if offset + data_size > len(self._map):
+            self.remap()
+
+        with memoryview(self._map)[offset:offset + data_size] as data:
+            image = QImage(data, width, height, bytes_per_line, QImage.Format.Format_ARGB32_Premultiplied).copy()
+        image.setDevicePixelRatio(dpr)
+        return image
+
+    def get_pixmap(self, key) -> Optional[QPixmap]:
+        image = self.get(key)
+        return QPixmap.fromImage(image) if image is not None else None
+
+    def put(self, key, image: QImage):
+        name = icon_key_name(key)
+        if name in self.index:
+            return
+
+        image = image.convertToFormat(QImage.Format.Format_ARGB32_Premultiplied)
+        data = bytes(image.constBits())[:image.sizeInBytes()]
+        key_bytes = name.encode("ascii")
+        offset = self._file.seek(0, os.SEEK_END)
+        data_offset = offset + self.RECORD.size + self.padded(len(key_bytes))
+
+        self._file.write(self.RECORD.pack(self.RECORD_MAGIC, len(key_bytes), image.width(), image.height(),
+                                          image.bytesPerLine(), image.devicePixelRatio(), len(data)))
+        self._file.write(key_bytes.ljust(self.padded(len(key_bytes)), b"\0"))
+        self._file.write(data)
+        self.index[name] = (data_offset, image.width(), image.height(), image.bytesPerLine(),
+                            image.devicePixelRatio(), len(data))
+
+        if data_offset + len(data) > self.max_bytes:
+            self.compact()
+
+    def compact(self, target: Optional[int] = None):
+        """Rewrite the file keeping the most recently used records that fit into target bytes."""
+        target = self.max_bytes * 3 // 4 if target is None else target
+        self.remap()
+
+        keep, size = [], self.HEADER.size
+        for name, entry in reversed(self.index.items()):
+            record_size = self.RECORD.size + self.padded(len(name)) + entry[5]
+            if size + record_size > target:
+                break
+            keep.append((name, entry))
+            size += record_size
+
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "wb") as f:
+            f.write(self.HEADER.pack(self.MAGIC, self.VERSION, 0))
+            for name, (offset, width, height, bytes_per_line, dpr, data_size) in reversed(keep):
+                key_bytes = name.encode("ascii")
+                f.write(self.RECORD.pack(self.RECORD_MAGIC, len(key_bytes), width, height,
+                                         bytes_per_line, dpr, data_size))
+                f.write(key_bytes.ljust(self.padded(len(key_bytes)), b"\0"))
+                f.write(self._map[offset:offset + data_size])
+
+        self.close()
+        os.replace(temp_path, self.path)
+        self.open()
+
+
+disk_cache: Optional[DiskIconCache] = None
+
+
+def enable_disk_cache(path: str, max_bytes: int = DISK_CACHE_BYTES) -> DiskIconCache:
+    """Keep rendered icons in a file at path, so later launches load them instead of rendering."""
+    global disk_cache
+    disable_disk_cache()
+    disk_cache = DiskIconCache(path, max_bytes)
+    return disk_cache
+
+
+def disable_disk_cache():
+    global disk_cache
+    if disk_cache is not None:
+        disk_cache.close()
+        disk_cache = None
+
+
+def load_stored_pixmap(key: tuple) -> Optional[QPixmap]:
+    """A pre-baked or disk cached pixmap of the icon, or None when it has to be rendered."""
+    pixmap = load_baked_pixmap(key)
+    if pixmap is None and disk_cache is not None:
+        pixmap = disk_cache.get_pixmap(key)
+    return pixmap
+
+
+def cached_svg_pixmap(
+        svg: str,
+        width: int,
+        height: int,
+        color: Union[QColor, str],
+        dpr: float = 1.0,
+        keep_aspect: bool = False
+) -> QPixmap:
+    """Return a colored pixmap for the SVG from the shared icon cache, rendering it on a miss."""
+    key = icon_key(svg, width, height, color, dpr, keep_aspect)
+    pixmap = icon_cache.get(key)
+    if pixmap is None:
+        pixmap = load_stored_pixmap(key)
+        if pixmap is None:
+            pixmap = svg_to_pixmap(svg, width, height, color, dpr, keep_aspect)
+            if disk_cache is not None:
+                disk_cache.put(key, pixmap.toImage())
+        icon_cache.put(key, pixmap)
+    return pixmap
+
+
+def svg_to_image(
+        svg: str,
+        width: int,
+        height: int,
+        color: Union[QColor, str],
+        dpr: float = 1.0,
+        keep_aspect: bool = False,
+        supersample: Optional[int] = None
+) -> QImage:
+    """
+    Same as svg_to_pixmap, but into a QImage with a renderer of its own,
+    so it is safe to call outside the GUI thread.
+    """
+    return colorize_mask(svg_mask(svg, width, height, dpr, keep_aspect, supersample, own_renderer=True), color)
+
+
+class RenderTask(QRunnable):
+    def __init__(self, key, args, signals):
+        super().__init__()
+        self.key = key
+        self.args = args
+        self.signals = signals
+
+    def run(self):
+        try:
+            image = svg_to_image(*self.args)
+        except Exception as error:
+            self.signals.failed.emit(self.key, error)
+            return
+        self.signals.finished.emit(self.key, image)
+
+
+class AsyncRenderer(QObject):
+    """
+    Rasterizes icons on a QThreadPool. Finished images come back to the GUI thread through a
+    queued signal, are stored in the icon cache and the waiting widgets are called back.
+    A render that raises emits failed(key, exception) instead; its waiting widgets are dropped,
+    so the next request of the icon renders it again.
+    """
+    finished = Signal(object, QImage)
+    failed = Signal(object, object)
+
+    def __init__(self, pool: Optional[QThreadPool] = None):
+        super().__init__()
+        self.pool = pool
+        self.pending = {}
+        self.finished.connect(self.onFinished, Qt.ConnectionType.QueuedConnection)
+        self.failed.connect(self.onFailed, Qt.ConnectionType.QueuedConnection)
+
+    def request(self, svg: str, width: int, height: int, color: Union[QColor, str], dpr: float = 1.0,
+                keep_aspect: bool = False, callback=None) -> Optional[QPixmap]:
+        """Return the cached pixmap, or None after scheduling its rendering and the callback."""
+        key = icon_key(svg, width, height, color, dpr, keep_aspect)
+        pixmap = icon_cache.get(key)
+        if pixmap is None:
+            pixmap = load_stored_pixmap(key)
+            if pixmap is not None:
+                icon_cache.put(key, pixmap)
+        if pixmap is not None:
+            return pixmap
+
+        callbacks = self.pending.get(key)
+        if callbacks is None:
+            callbacks = self.pending[key] = []
+            task = RenderTask(key, (svg, width, height, QColor(color), dpr, keep_aspect), self)
+            (self.pool or QThreadPool.globalInstance()).start(task)
+        if callback is not None:
+            callbacks.append(weakref.WeakMethod(callback))
+        return None
+
+    def onFinished(self, key, image):
+        if disk_cache is not None:
+            disk_cache.put(key, image)
+        icon_cache.put(key, QPixmap.fromImage(image))
+        for ref in self.pending.pop(key, []):
+            callback = ref()
+            if callback is None:
+                continue
+            try:
+                callback()
+            except RuntimeError:
+                # the widget was deleted while its icon was rendering
+                pass
+
+    def onFailed(self, key, error):
+        self.pending.pop(key, None)
+
+
+async_renderer = AsyncRenderer()
+
+
+class AtlasPage:
+    """One atlas pixmap filled shelf by shelf, left to right."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.pixmap = QPixmap(size, size)
+        self.pixmap.fill(Qt.GlobalColor.transparent)
+        self.keys = set()
+        self.shelves = []  # [y, height, next free x]
+        self.used = 0
+
+    def reset(self):
+        self.keys.clear()
+        self.shelves.clear()
+
+    def allocate(self, width: int, height: int) -> Optional[QRect]:
+        if width > self.size or height > self.size:
+            return None
+
+        for shelf in self.shelves:
+            y, shelf_height, x = shelf
+            if height <= shelf_height and x + width <= self.size:
+                shelf[2] += width
+                return QRect(x, y, width, height)
+
+        y = self.shelves[-1][0] + self.shelves[-1][1] if self.shelves else 0
+        if y + height > self.size:
+            return None
+
+        self.shelves.append([y, height, width])
+        return QRect(0, y, width, height)
+
+
+class IconAtlas:
+    """
+    Packs rendered icons into a few large pixmap pages.
+    When every page is full, the least recently used page is emptied and reused,
+    icons that lived on it are rendered again the next time they are painted.
+    """
+
+    def __init__(self, page_size: int = ATLAS_PAGE_SIZE, max_pages: int = ATLAS_MAX_PAGES):
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.pages = []
+        self.entries = {}
+        self._tick = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def clear(self):
+        self.pages.clear()
+        self.entries.clear()
+
+    def lookup(self, svg: str, width: int, height: int, color: Union[QColor, str], dpr: float = 1.0,
+               keep_aspect: bool = False) -> Tuple[QPixmap, QRectF]:
+        """Return the page and the source rect in device pixels of the icon, rendering it if needed."""
         color = QColor(color)
+        key = icon_key(svg, width, height, color, dpr, keep_aspect)
+        self._tick += 1
+        entry = self.entries.get(key)
+        if entry is None:
+            entry = self.entries[key] = self.insert(key, svg, width, height, color, dpr, keep_aspect)
+
+        page, rect = entry
+        page.used = self._tick
+        return page.pixmap, QRectF(rect)
+
+    def insert(self, key, svg, width, height, color, dpr, keep_aspect):
+        device_width, device_height = max(1, round(width * dpr)), max(1, round(height * dpr))
+        page, rect = None, None
+        for page in self.pages:
+            rect = page.allocate(device_width, device_height)
+            if rect is not None:
+                break
+
+        if rect is None:
+            page = self.freePage()
+            rect = page.allocate(device_width, device_height)
+            if rect is None:
+                raise ValueError(f"Icon {width}x{height} does not fit into a {self.page_size}px atlas page")
+
+        stored = load_stored_pixmap(key)
+        painter = QPainter(page.pixmap)
+        painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_Source)
+        if stored is not None and stored.size() == rect.size():
+            painter.drawPixmap(rect.topLeft(), stored)
+        else:
+            painter.drawImage(QRectF(rect), colorize_mask(svg_mask(svg, width, height, dpr, keep_aspect), color))
+        painter.end()
+        if stored is None and disk_cache is not None:
+            disk_cache.put(key, page.pixmap.copy(rect).toImage())
+        page.keys.add(key)
+        return page, rect
+
+    def freePage(self) -> AtlasPage:
+        if len(self.pages) < self.max_pages:
+            page = AtlasPage(self.page_size)
+            self.pages.append(page)
+            return page
+
+        page = min(self.pages, key=lambda p: p.used)
+        for key in page.keys:
+            self.entries.pop(key, None)
+        page.reset()
+        return page
+
+
+icon_atlas = IconAtlas()
+
+
+class AnimationTicker(QObject):
+    """
+    One application-wide timer that advances every animated SVG widget on screen.
+
+    Widgets subscribe while they are visible and are asked to show the current frame on each tick.
+    Frames follow one shared clock, so identical spinners show the same frame and each frame is
+    rasterized once per SVG, size and color into the shared icon cache. The timer only runs while
+    a widget is subscribed.
+    """
+
+    def __init__(self, interval: int = ANIMATION_INTERVAL):
+        super().__init__()
+        self.interval = interval
+        self.widgets = weakref.WeakSet()
+        self.renderers = weakref.WeakValueDictionary()
+        self.started = time.monotonic()
+        self.timer = None
+
+    def __len__(self):
+        return len(self.widgets)
+
+    def renderer(self, svg: str) -> QSvgRenderer:
+        """A renderer of the SVG whose frame is set explicitly, without the timer of its own."""
+        renderer = self.renderers.get(svg)
+        if renderer is None:
+            renderer = self.renderers[svg] = SvgRendererRegistry.create(svg)
+            renderer.setAnimationEnabled(False)
+        return renderer
+
+    def frame(self, renderer: QSvgRenderer) -> int:
+        fps = max(1, renderer.framesPerSecond())
+        frames = max(1, renderer.animationDuration() * fps // 1000)
+        return int((time.monotonic() - self.started) * fps) % frames
+
+    def subscribe(self, widget: QWidget):
+        self.widgets.add(widget)
+        if self.timer is None:
+            self.timer = QTimer(self)
+            self.timer.timeout.connect(self.tick)
+        if not self.timer.isActive():
+            self.timer.start(self.interval)
+
+    def unsubscribe(self, widget: QWidget):
+        self.widgets.discard(widget)
+        if not self.widgets and self.timer is not None:
+            self.timer.stop()
+
+    def handleEvent(self, widget: QWidget, e: QEvent):
+        """Run the animation of a widget while it is shown, pause it while it is hidden."""
+        if e.type() == QEvent.Type.Show and widget.animated:
+            self.subscribe(widget)
+        elif e.type() == QEvent.Type.Hide:
+            self.unsubscribe(widget)
+
+    def tick(self):
+        for widget in list(self.widgets):
+            try:
+                widget.showAnimationFrame()
+            except RuntimeError:
+                # deleted while it was animating
+                self.widgets.discard(widget)
+        if not self.widgets:
+            self.timer.stop()
+
+
+animation_ticker = AnimationTicker()
+
+
+def animation_frame_pixmap(
+        svg: str,
+        width: int,
+        height: int,
+        color: Optional[Union[QColor, str]],
+        dpr: float = 1.0,
+        frame: int = 0
+) -> QPixmap:
+    """One frame of an animated SVG from the shared icon cache, filled with color if one is given."""
+    key = icon_key(svg, width, height, color or Qt.GlobalColor.transparent, dpr) + ("frame", color is None, frame)
+    pixmap = icon_cache.get(key)
+    if pixmap is None:
+        renderer = animation_ticker.renderer(svg)
+        renderer.setCurrentFrame(frame)
+        if color:
+            image = colorize_mask(render_svg_mask(svg, width, height, dpr, renderer=renderer), color)
+        else:
+            image = QImage(max(1, round(width * dpr)), max(1, round(height * dpr)),
+                           QImage.Format.Format_ARGB32_Premultiplied)
+            image.setDevicePixelRatio(dpr)
+            painter = QPainter(image)
+            paint_svg(painter, QRectF(0, 0, width, height), svg, None, renderer=renderer)
+            painter.end()
+        pixmap = QPixmap.fromImage(image)
+        icon_cache.put(key, pixmap)
+    return pixmap
+
 
-    renderer = QSvgRenderer(svg_filename)
-    pixmap = QPixmap(width * 10, height * 10)
-    pixmap = pixmap.scaled(width * 10, height * 10, Qt.AspectRatioMode.KeepAspectRatio,
-                           Qt.TransformationMode.SmoothTransformation)
+@lru_cache(maxsize=32)
+def placeholder_icon(width: int, height: int) -> QIcon:
+    """Transparent icon that keeps the size hint and layout of a button whose icon comes from the atlas."""
+    pixmap = QPixmap(width, height)
     pixmap.fill(Qt.GlobalColor.transparent)
-    painter = QPainter(pixmap)
-    renderer.render(painter)
-    painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-    painter.setCompositionMode(
-        painter.CompositionMode.CompositionMode_SourceIn)
-    painter.fillRect(pixmap.rect(), color)
-    painter.end()
-    return pixmap
+    return QIcon(pixmap)
+
+
+def draw_atlas_label(
+        painter: QPainter,
+        widget: QWidget,
+        rect: QRect,
+        atlas_icon: Optional[tuple],
+        text: str,
+        state: str,
+        alignment=Qt.AlignmentFlag.AlignCenter
+):
+    """Draw an atlas icon followed by the text inside rect, as the styles lay out a button label."""
+    icon_width, icon_height = atlas_icon[1:3] if atlas_icon else (0, 0)
+    text_width = widget.fontMetrics().horizontalAdvance(text) if text else 0
+    spacing = ICON_SPACING if atlas_icon and text else 0
+
+    x = rect.x()
+    if alignment & Qt.AlignmentFlag.AlignHCenter:
+        x += (rect.width() - icon_width - spacing - text_width) // 2
+
+    if atlas_icon:
+        page, source = icon_atlas.lookup(*atlas_icon)
+        target = QRectF(x, rect.y() + (rect.height() - icon_height) / 2, icon_width, icon_height)
+        painter.drawPixmap(target, page, source)
+
+    if text:
+        color = style_cache.states(widget, "color").get(state)
+        palette = widget.palette()
+        if color:
+            palette.setColor(QPalette.ColorRole.ButtonText, QColor(color))
+            palette.setColor(QPalette.ColorRole.WindowText, QColor(color))
+
+        text_rect = QRect(x + icon_width + spacing, rect.y(), text_width, rect.height())
+        widget.style().drawItemText(painter, text_rect, Qt.AlignmentFlag.AlignVCenter | Qt.TextFlag.TextShowMnemonic,
+                                    palette, widget.isEnabled(), text, QPalette.ColorRole.ButtonText)
+
+
+def draw_atlas_push_button(button: QPushButton):
+    """Paint a push button whose icon comes from the atlas: the bevel, then the icon and text."""
+    painter = QStylePainter(button)
+    opt = QStyleOptionButton()
+    button.initStyleOption(opt)
+    opt.text, opt.icon = "", QIcon()
+    painter.drawControl(QStyle.ControlElement.CE_PushButton, opt)
+    rect = button.style().subElementRect(QStyle.SubElement.SE_PushButtonContents, opt, button)
+    draw_atlas_label(painter, button, rect, button.atlas_icon, button.text(), button.icon_state)
+
+
+def state_icon_pixmaps(widget, icon) -> list:
+    """The (svg, pixmap) pairs behind a state icon of the widget. Atlas icons live in the atlas pages."""
+    if isinstance(icon, dict):
+        return list(icon.items())
+
+    svg = getattr(widget, "svg_path", None) or getattr(widget, "svg_string", None)
+    if isinstance(icon, QPixmap):
+        return [(svg, icon)]
+    if isinstance(icon, QIcon):
+        dpr = widget.devicePixelRatioF()
+        return [(svg, icon.pixmap(QSize(round(size.width() / dpr), round(size.height() / dpr)), dpr))
+                for size in icon.availableSizes()]
+    return []
+
+
+class IconMemory:
+    """
+    Accounting of the pixmaps held by the icon state tables and icon engines of the widgets, behind a global budget.
+
+    A pixmap shared by several widgets counts once in the total and for its SVG, and in full for
+    every widget holding it. When the total exceeds max_bytes the least recently shown state icons
+    are dropped from their tables or engines and from icon_cache, which render them again the next
+    time they are shown. The icons widgets are showing right now are never dropped.
+    Animation frames and atlas pages are not covered, they are bounded by icon_cache and the atlas.
+    """
+
+    def __init__(self, max_bytes: int = ICON_MEMORY_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.entries = OrderedDict()
+        self.tables = {}
+        self.refs = Counter()
+        self.pixmaps = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def track(self, table, widget, state, icon):
+        """Account the icon the table (an IconStateTable or SvgIconEngine) holds for the widget under state."""
+        key = (id(table), state)
+        self.forget(key)
+
+        items = []
+        for svg, pixmap in state_icon_pixmaps(widget, icon):
+            if not pixmap.isNull():
+                items.append((svg, pixmap.cacheKey(), IconCache.pixmap_bytes(pixmap)))
+        if not items:
+            return
+
+        if id(table) not in self.tables:
+            self.tables[id(table)] = weakref.ref(table, lambda _, table_id=id(table): self.release(table_id))
+        self.entries[key] = (weakref.ref(widget), items)
+        for svg, cache_key, size in items:
+            self.refs[cache_key] += 1
+            if self.refs[cache_key] == 1:
+                self.pixmaps[cache_key] = (svg, size)
+                self.bytes += size
+        self.evict()
+
+    def touch(self, table, state):
+        key = (id(table), state)
+        if key in self.entries:
+            self.entries.move_to_end(key)
+
+    def forget(self, key) -> list:
+        """Forget an icon, returning the cacheKey() of its pixmaps no other table holds."""
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return []
+
+        released = []
+        for svg, cache_key, size in entry[1]:
+            self.refs[cache_key] -= 1
+            if self.refs[cache_key] <= 0:
+                del self.refs[cache_key]
+                del self.pixmaps[cache_key]
+                self.bytes -= size
+                released.append(cache_key)
+        return released
+
+    def release(self, table_id: int):
+        """Forget every icon of a table or engine that was invalidated or deleted."""
+        if self.tables.pop(table_id, None) is None:
+            return
+        for key in [key for key in self.entries if key[0] == table_id]:
+            self.forget(key)
+
+    def evict(self):
+        if self.bytes <= self.max_bytes:
+            return
+
+        # the most recently shown icon and the icons on screen stay, even if they exceed the budget
+        for table_id, state in list(self.entries)[:-1]:
+            if self.bytes <= self.max_bytes:
+                break
+            ref = self.tables.get(table_id)
+            table = ref() if ref is not None else None
+            if table is not None:
+                if table.shows(state):
+                    continue
+                table.drop(state)
+            for cache_key in self.forget((table_id, state)):
+                icon_cache.discard(cache_key)
+
+    def setMaxBytes(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.evict()
+
+    @staticmethod
+    def svgLabel(svg: Optional[str]) -> str:
+        """The path of an SVG file, or the content hash of SVG markup."""
+        if svg and is_svg_markup(svg):
+            return f"<svg {svg_digest(svg)[:12]}>"
+        return svg or ""
+
+    def report(self, top: int = 10) -> dict:
+        widgets = {}
+        for widget_ref, items in self.entries.values():
+            widget = widget_ref()
+            if widget is None:
+                continue
+            try:
+                name = type(widget).__name__, widget.objectName()
+            except RuntimeError:
+                continue
+            entry = widgets.setdefault(id(widget), [*name, 0])
+            entry[2] += sum(size for _, _, size in items)
+
+        svgs = Counter()
+        for svg, size in self.pixmaps.values():
+            svgs[self.svgLabel(svg)] += size
+
+        # pixmaps both held by widgets and cached count once
+        shared = sum(size for cache_key, (_, size) in self.pixmaps.items() if icon_cache.holds(cache_key))
+        return {
+            "bytes": self.bytes,
+            "total_bytes": self.bytes + icon_cache.bytes - shared,
+            "max_bytes": self.max_bytes,
+            "icons": len(self.entries),
+            "pixmaps": len(self.pixmaps),
+            "caches": {"icons": icon_cache.bytes, "masks": mask_cache.bytes},
+            "widgets": sorted((tuple(entry) for entry in widgets.values()), key=lambda entry: -entry[2])[:top],
+            "svgs": svgs.most_common(top),
+        }
+
+
+icon_memory = IconMemory()
+
+
+def memory_report(top: int = 10) -> dict:
+    """
+    Bytes of the icon pixmaps held by widgets: the total against the budget, the top widgets as
+    (class, object name, bytes) and the top SVGs as (svg, bytes), plus the shared icon and mask caches.
+    total_bytes adds the icon cache to the widget bytes, counting pixmaps held by both once.
+    """
+    return icon_memory.report(top)
+
+
+class IconStateTable:
+    """
+    Colors and prebuilt icons of one widget for the normal, hover, pressed and checked states.
+    Colors are resolved once per build, icons are produced by widget.renderStateIcon(color)
+    the first time a state is shown and reused until the SVG, size or style changes.
+    """
+
+    def __init__(self):
+        self.colors = {}
+        self.icons = {}
+        self.current = None
+        self.built = False
+
+    def invalidate(self):
+        self.colors.clear()
+        self.icons.clear()
+        self.current = None
+        self.built = False
+        icon_memory.release(id(self))
+
+    def drop(self, state):
+        self.icons.pop(state, None)
+
+    def shows(self, state) -> bool:
+        return self.current is not None and self.colors.get(state) == self.current
+
+    def build(self, widget):
+        self.invalidate()
+        self.colors = dict(style_cache.states(widget))
+        self.built = True
+
+    def color(self, widget, state):
+        if not self.built:
+            self.build(widget)
+        return self.colors.get(state)
+
+    def icon(self, widget, state):
+        color = self.color(widget, state)
+        if not color:
+            return None
+
+        icon = self.icons.get(state)
+        if icon is None:
+            # None while an asynchronous render is still running, asked again once it is done
+            icon = widget.renderStateIcon(color)
+            if icon is not None:
+                self.icons[state] = icon
+                icon_memory.track(self, widget, state, icon)
+        else:
+            icon_memory.touch(self, state)
+        return icon
+
+    def select(self, widget, state):
+        """Return the icon of the state, or None when the widget already shows that color."""
+        color = self.color(widget, state)
+        if not color or color == self.current:
+            if color:
+                icon_memory.touch(self, state)
+            return None
+
+        icon = self.icon(widget, state)
+        if icon is not None:
+            self.current = color
+        return icon
+
+
+ICON_MODE_STATES = {
+    QIcon.Mode.Normal: "normal",
+    QIcon.Mode.Active: "hover",
+    QIcon.Mode.Selected: "pressed",
+    QIcon.Mode.Disabled: "normal",
+}
+
+
+class SvgIconEngine(QIconEngine):
+    """
+    Icon engine that renders an SVG only when Qt asks for a size, mode and state.
+
+    colors maps the states normal, hover, pressed and checked to icon colors, e.g. the result
+    of style_cache.states(widget). Qt's Active and Selected modes and the On state pick the
+    hover, pressed and checked colors. A widget can also drive the state itself with setState(),
+    which then applies to the Normal mode. Rendered pixmaps are kept per size and color, and
+    accounted in icon_memory for the widget when one is given.
+    """
+
+    def __init__(self, svg: str, colors: Optional[dict] = None, keep_aspect: bool = False, follow_mode: bool = True,
+                 widget: Optional[QWidget] = None):
+        super().__init__()
+        self.svg = svg
+        self.colors = dict(colors or {})
+        self.keep_aspect = keep_aspect
+        self.follow_mode = follow_mode
+        self.state = "normal"
+        self.pixmaps = {}
+        self.widget = weakref.ref(widget) if widget is not None else None
+
+    @classmethod
+    def fromWidget(cls, widget: QWidget, svg: str, **kwargs) -> "SvgIconEngine":
+        """Engine with the icon-color of every state of the widget resolved from the stylesheets."""
+        return cls(svg, style_cache.states(widget), **kwargs)
+
+    def key(self):
+        return "SvgIconEngine"
+
+    def clone(self):
+        engine = SvgIconEngine(self.svg, self.colors, self.keep_aspect, self.follow_mode)
+        engine.state = self.state
+        return engine
+
+    def isNull(self):
+        return not self.svg
+
+    def setColors(self, colors: dict):
+        self.colors = dict(colors)
+        self.pixmaps.clear()
+        icon_memory.release(id(self))
+
+    def drop(self, key):
+        self.pixmaps.pop(key, None)
+
+    def shows(self, key) -> bool:
+        return key[2] == self.color(QIcon.Mode.Normal, QIcon.State.Off)
+
+    def setState(self, state: str) -> bool:
+        """Switch the state shown in Normal mode. Returns True if the icon looks different now."""
+        changed = self.color(QIcon.Mode.Normal, QIcon.State.Off) != self.color(QIcon.Mode.Normal, QIcon.State.Off, state)
+        self.state = state
+        return changed
+
+    def color(self, mode, state, current: Optional[str] = None):
+        current = current or self.state
+        if state == QIcon.State.On and self.colors.get("checked"):
+            return self.colors["checked"]
+        if mode == QIcon.Mode.Normal or not self.follow_mode:
+            return self.colors.get(current) or self.colors.get("normal")
+        return self.colors.get(ICON_MODE_STATES[mode]) or self.colors.get("normal")
+
+    def pixmap(self, size, mode, state):
+        color = self.color(mode, state)
+        key = (size.width(), size.height(), color)
+        pixmap = self.pixmaps.get(key)
+        if pixmap is None:
+            if color:
+                pixmap = cached_svg_pixmap(self.svg, size.width(), size.height(), color, keep_aspect=self.keep_aspect)
+            else:
+                pixmap = QPixmap(size)
+                pixmap.fill(Qt.GlobalColor.transparent)
+                painter = QPainter(pixmap)
+                paint_svg(painter, QRectF(pixmap.rect()), self.svg, None, self.keep_aspect)
+                painter.end()
+            self.pixmaps[key] = pixmap
+            widget = self.widget() if self.widget is not None else None
+            if widget is not None:
+                icon_memory.track(self, widget, key, pixmap)
+        else:
+            icon_memory.touch(self, key)
+        return pixmap
+
+    def paint(self, painter, rect, mode, state):
+        dpr = painter.device().devicePixelRatioF() if painter.device() else 1.0
+        size = QSize(max(1, round(rect.width() * dpr)), max(1, round(rect.height() * dpr)))
+        painter.drawPixmap(rect, self.pixmap(size, mode, state))
+
+
+class QDropLabel(QLabel):
+    """Label of QDropButton, its stylesheet is only replaced when the text color actually changes."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.text_color = None
+
+    def setTextColor(self, color):
+        color = QColor(color).name(QColor.NameFormat.HexArgb)
+        if color != self.text_color:
+            self.text_color = color
+            # a label-local sheet outranks the color rules of ancestors and the application
+            self.setStyleSheet("* {color: {COLOR};}".replace("{COLOR}", color))
 
 
 class QDropButton(QWidget):
@@ -140,13 +1856,13 @@ class QDropButton(QWidget):
     ):
         super().__init__(*args, **kwargs)
         self.text = text
-        self.left_svg = left_svg
-        self.right_svg = right_svg
-        self.minus_svg = minus_svg
+        self.left_svg = svg_pool.intern(left_svg)
+        self.right_svg = svg_pool.intern(right_svg)
+        self.minus_svg = svg_pool.intern(minus_svg)
         self.only_click = only_click
         self.save_state = save_state
         self.text_alignment = text_alignment
-        self.stylecode = None
+        self.renderers = [renderer_registry.get(svg) for svg in (self.left_svg, self.right_svg, self.minus_svg) if svg]
 
         if not self.minus_svg:
             self.save_state = False
@@ -156,8 +1872,24 @@ class QDropButton(QWidget):
 
         self.state_release = False
         self.size = (20, 20)
+        self.icon_states = IconStateTable()
+        self.icon_state = ("normal", False)
+        self.coalesce_hover = HOVER_COALESCING
+        self.lazy_render = LAZY_RENDER
+        self.shown = None
         self.initWidget()
 
+    def event(self, e):
+        if style_cache.handleEvent(self, e):
+            self.icon_states.invalidate()
+            self.shown = None
+            theme_coordinator.schedule(self)
+        polish_scheduler.handleEvent(self, e)
+        return super().event(e)
+
+    def refreshIcon(self):
+        self.setState("hover" if self.underMouse() else "normal", self.state_release)
+
     def paintEvent(self, event):
         opt = QStyleOption()
         opt.initFrom(self)
@@ -171,6 +1903,8 @@ class QDropButton(QWidget):
         if isinstance(width, QSize):
             width, height = width.width(), width.height()
         self.size = (width, height)
+        self.icon_states.invalidate()
+        self.shown = None
         self.right.setSvgSize(*self.size)
 
     def setIconLeftSize(self, width: Union[int, QSize], height: Optional[int] = None):
@@ -181,6 +1915,8 @@ class QDropButton(QWidget):
 
     def initWidget(self):
         """Initialize the widget."""
+        # registered ahead of its icons, which only fall back to plain pixmaps when nothing colored them
+        polish_scheduler.schedule(self)
         layout = QHBoxLayout()
         layout.setSpacing(0)
 
@@ -200,7 +1936,6 @@ class QDropButton(QWidget):
 
         self.setLayout(layout)
         self.setStyleSheet("QLabel {background: transparent;}")
-        QTimer.singleShot(100, partial(self.leaveEvent, None))
 
     def createButton(self, svg_path):
         """Create and return a button with an icon."""
@@ -212,7 +1947,7 @@ class QDropButton(QWidget):
 
     def createLabel(self, text):
         """Create and return a label."""
-        label = QLabel(text)
+        label = QDropLabel(text)
         return label
 
     def updateIcon(self, color, hover=False):
@@ -224,58 +1959,70 @@ class QDropButton(QWidget):
         for svg, button in zip(svgs, [self.left, self.right]):
             pixmap = self.generateColoredPixmap(svg, color)
             button.setPixmap(pixmap)
+        self.label.setTextColor(color)
+        self.shown = (color, svgs[1])
+
+    def renderStateIcon(self, color):
+        svgs = {self.left_svg, self.right_svg, self.minus_svg} - {None}
+        return {svg: cached_svg_pixmap(svg, *self.size, color, self.devicePixelRatioF()) for svg in svgs}
+
+    def setHoverCoalescing(self, enabled: bool):
+        """Apply state changes at most once per frame, dropping the states a fast sweep passes through."""
+        self.coalesce_hover = enabled
+
+    def setLazyRender(self, enabled: bool):
+        """Render the icon only once the widget is shown or painted, not while it is hidden or scrolled out."""
+        self.lazy_render = enabled
+
+    def setState(self, state, hover=False):
+        """Show the prebuilt icons of the state, skipping the update when nothing changed."""
+        self.icon_state = (state, hover)
+        if self.coalesce_hover:
+            state_coalescer.schedule(self)
+        else:
+            self.applyState()
+
+    def applyState(self):
+        if self.lazy_render and polish_scheduler.defer(self):
+            return
+
+        state, hover = self.icon_state
+        right_svg = self.right_svg if not hover and not self.state_release else self.minus_svg
+        color = self.icon_states.color(self, state)
+        if not color:
+            if self.right.svg_path != right_svg:
+                self.right.setIcon(right_svg)
+                self.right.showPlainIcon()
+            return
+
+        if self.shown == (color, right_svg):
+            return
+
+        pixmaps = self.icon_states.icon(self, state)
+        self.left.setPixmap(pixmaps[self.left_svg])
+        self.right.svg_path = right_svg
+        self.right.setPixmap(pixmaps[right_svg])
+        self.label.setTextColor(color)
+        self.shown = (color, right_svg)
 
     def generateColoredPixmap(self, svg_path, color):
         """Generate a colored pixmap from an SVG."""
-        renderer = QSvgRenderer(svg_path)
-        pixmap = QPixmap(*self.size)
-        pixmap.fill(Qt.transparent)
-        painter = QPainter(pixmap)
-        renderer.render(painter)
-        painter.setCompositionMode(QPainter.CompositionMode_SourceIn)
-        painter.fillRect(pixmap.rect(), color)
-        painter.save()
-        self.label.setStyleSheet("* {color: {COLOR};}".replace("{COLOR}", color))
-        return pixmap
+        return cached_svg_pixmap(svg_path, *self.size, color, self.devicePixelRatioF())
 
     def setPixmap(self, icon, pixmap):
         icon.setPixmap(pixmap)
 
     def enterEvent(self, event):
-        hover = False
-        if (self.minus_svg and not self.only_click):
-            hover = True
-            self.right.setIcon(self.minus_svg)
-
-        if not self.stylecode:
-            effective_style, self.stylecode = get_effective_style(self, hover=True)
-        else:
-            effective_style, _ = get_color(type(self).__name__, self.stylecode, hover=True)
-        self.updateIcon(effective_style, hover)
+        hover = bool(self.minus_svg and not self.only_click)
+        self.setState("hover", hover)
         super().enterEvent(event)
 
     def leaveEvent(self, event):
-        if self.minus_svg:
-            self.right.setIcon(self.right_svg)
-
-        if not self.stylecode:
-            effective_style, self.stylecode = get_effective_style(self)
-        else:
-            effective_style, _ = get_color(type(self).__name__, self.stylecode)
-        self.updateIcon(effective_style, self.state_release)
+        self.setState("normal", self.state_release)
         super().leaveEvent(event)
 
     def mousePressEvent(self, event):
-        hover = False
-        if self.minus_svg:
-            hover = True
-            self.right.setIcon(self.minus_svg)
-
-        if not self.stylecode:
-            effective_style, self.stylecode = get_effective_style(self, pressed=True)
-        else:
-            effective_style, _ = get_color(type(self).__name__, self.stylecode, pressed=True)
-        self.updateIcon(effective_style, hover)
+        self.setState("pressed", bool(self.minus_svg))
         super().mousePressEvent(event)
 
     def mouseReleaseEvent(self, event=None):
@@ -290,24 +2037,178 @@ class QDropButton(QWidget):
             if (self.minus_svg and not self.only_click) or self.state_release:
                 """ If widget have open svg and not active only_click """
                 hover = True
-                self.right.setIcon(self.minus_svg)
-
-            if not self.stylecode:
-                effective_style, self.stylecode = get_effective_style(self, hover=True)
-            else:
-                effective_style, _ = get_color(type(self).__name__, self.stylecode, hover=True)
+            self.setState("hover", hover)
         else:
-            if not self.stylecode:
-                effective_style, self.stylecode = get_effective_style(self, hover=False)
-            else:
-                effective_style, _ = get_color(type(self).__name__, self.stylecode, hover=True)
+            self.setState("normal", hover)
 
-        self.updateIcon(effective_style, hover)
         if event:
             super().mouseReleaseEvent(event)
 
 
-class QIconSvg(QLabel):
+class SvgStateMixin:
+    """
+    Icon state handling shared by the widgets that show one SVG in the icon-color of their state.
+
+    The widget keeps its SVG in the svg_attribute and its icon size in the size_attribute, the
+    icons of its states in icon_states and its mode flags (async_render, coalesce_hover,
+    lazy_render, ...) as attributes set in __init__.
+    """
+    svg_attribute = "svg_path"
+    size_attribute = "size"
+    keep_aspect = False
+    atlas = False
+    icon_engine_mode = False
+    animate = False
+    animated = False
+    closed = False
+
+    def svgSource(self) -> Optional[str]:
+        return getattr(self, self.svg_attribute)
+
+    def svgSize(self) -> Tuple[int, int]:
+        return getattr(self, self.size_attribute)
+
+    def setAsyncRender(self, enabled: bool):
+        """Rasterize icons on a thread pool, keeping the previous icon until the new one is ready."""
+        self.async_render = enabled
+        self.icon_states.invalidate()
+
+    def setHoverCoalescing(self, enabled: bool):
+        """Apply state changes at most once per frame, dropping the states a fast sweep passes through."""
+        self.coalesce_hover = enabled
+
+    def setLazyRender(self, enabled: bool):
+        """Render the icon only once the widget is shown or painted, not while it is hidden or scrolled out."""
+        self.lazy_render = enabled
+
+    def setAtlasMode(self, enabled: bool):
+        """Paint the icon from the shared icon atlas instead of a pixmap of its own."""
+        self.atlas = enabled
+        self.atlas_icon = None
+        self.icon_states.invalidate()
+        self.leaveEvent(None)
+
+    def setIconEngineMode(self, enabled: bool):
+        """Show one QIcon backed by SvgIconEngine and switch its state instead of the icon."""
+        self.icon_engine_mode = enabled
+        self.engine = None
+        self.icon_states.invalidate()
+        self.leaveEvent(None)
+
+    def setAnimated(self, enabled: bool):
+        """Play animated SVGs (the default) or show their first frame only."""
+        self.animate = enabled
+        self.updateAnimation()
+        self.leaveEvent(None)
+
+    def updateAnimation(self):
+        self.animated = bool(self.animate and self.renderer is not None and self.renderer.animated())
+        # holding the renderer keeps it in the ticker's weak table
+        self.animation_renderer = animation_ticker.renderer(self.svgSource()) if self.animated else None
+        self.frame_shown = None
+        if self.animated and self.isVisible():
+            animation_ticker.subscribe(self)
+        elif not self.animated:
+            animation_ticker.unsubscribe(self)
+
+    def showAnimationFrame(self):
+        """Show the frame of the shared animation clock in the color of the current state."""
+        states = style_cache.states(self)
+        color = states.get(self.icon_state) or states.get("normal")
+        key = (animation_ticker.frame(self.animation_renderer), color, self.svgSize(), self.devicePixelRatioF())
+        if key == self.frame_shown:
+            return
+
+        self.frame_shown = key
+        self.setStateIcon(QIcon(animation_frame_pixmap(self.svgSource(), *self.svgSize(), color, key[3], key[0])))
+
+    def updateIcon(self, color):
+        if not color or not self.svgSource():
+            return
+
+        icon = self.renderStateIcon(color)
+        if icon is not None:
+            self.icon_states.current = color
+            self.showIcon(icon)
+
+    def stateIcon(self, pixmap):
+        """What showIcon takes for a rendered pixmap."""
+        return QIcon(pixmap)
+
+    def renderStateIcon(self, color):
+        svg, size, dpr = self.svgSource(), self.svgSize(), self.devicePixelRatioF()
+        if self.atlas:
+            return svg, *size, color, dpr, self.keep_aspect
+        if self.async_render:
+            pixmap = async_renderer.request(svg, *size, color, dpr, keep_aspect=self.keep_aspect,
+                                            callback=self.iconRendered)
+            return self.stateIcon(pixmap) if pixmap is not None else None
+        return self.stateIcon(cached_svg_pixmap(svg, *size, color, dpr, keep_aspect=self.keep_aspect))
+
+    def iconRendered(self):
+        if not self.closed:
+            self.setState(self.icon_state)
+
+    def setStateIcon(self, icon: QIcon):
+        self.setIcon(icon)
+        self.setIconSize(QSize(*self.svgSize()))
+
+    def showIcon(self, icon):
+        if self.atlas:
+            self.atlas_icon = icon
+            icon = placeholder_icon(*self.svgSize())
+            self.update()
+        self.setStateIcon(icon)
+
+    def showPlaceholder(self):
+        """Hold the place of the icon while its first asynchronous render is running."""
+        if self.icon().isNull():
+            self.setStateIcon(placeholder_icon(*self.svgSize()))
+
+    def showEngineState(self, state):
+        if not self.icon_states.built:
+            self.icon_states.build(self)
+        # the table may have been rebuilt by a color lookup since the engine was made
+        if self.engine is None or self.engine.colors != self.icon_states.colors:
+            self.engine = SvgIconEngine(self.svgSource(), self.icon_states.colors, keep_aspect=self.keep_aspect,
+                                        follow_mode=False, widget=self)
+            self.engine.setState(state)
+            self.setStateIcon(QIcon(self.engine))
+        elif self.engine.setState(state):
+            self.update()
+
+    def setState(self, state):
+        """Show the prebuilt icon of the state, on the next frame in hover coalescing mode."""
+        if not self.svgSource():
+            return
+
+        self.icon_state = state
+        if self.coalesce_hover:
+            state_coalescer.schedule(self)
+        else:
+            self.applyState()
+
+    def applyState(self):
+        if self.lazy_render and polish_scheduler.defer(self):
+            return
+
+        state = self.icon_state
+        if self.animated:
+            self.showAnimationFrame()
+            return
+
+        if self.icon_engine_mode:
+            self.showEngineState(state)
+            return
+
+        icon = self.icon_states.select(self, state)
+        if icon is not None:
+            self.showIcon(icon)
+        elif self.async_render:
+            self.showPlaceholder()
+
+
+class QIconSvg(SvgStateMixin, QLabel):
     clicked = Signal()
 
     def __init__(self, svg_path: Optional[str] = None, *args, **kwargs):
@@ -315,10 +2216,42 @@ class QIconSvg(QLabel):
         self.svg_path = svg_path
         self.size = (20, 20)
         self.disable = False
-        self.stylecode = None
+        self.renderer = None
+        self.icon_states = IconStateTable()
+        self.atlas = ICON_ATLAS
+        self.async_render = ASYNC_RENDER
+        self.coalesce_hover = HOVER_COALESCING
+        self.lazy_render = LAZY_RENDER
+        self.icon_engine_mode = ICON_ENGINE
+        self.engine = None
+        self.animate = True
+        self.animated = False
+        self.animation_renderer = None
+        self.frame_shown = None
+        self.state_icon = None
+        self.atlas_icon = None
+        self.icon_state = "normal"
         if self.svg_path:
             self.setIcon(self.svg_path)
 
+    def event(self, e):
+        if style_cache.handleEvent(self, e):
+            self.icon_states.invalidate()
+            theme_coordinator.schedule(self)
+        polish_scheduler.handleEvent(self, e)
+        animation_ticker.handleEvent(self, e)
+        return super().event(e)
+
+    def refreshIcon(self):
+        if self.disable:
+            # the owner sets the pixmaps, only fill in the plain icon until it does
+            if self.pixmap().isNull():
+                self.showPlainIcon()
+        elif self.icon_states.color(self, self.icon_state):
+            self.setState(self.icon_state)
+        else:
+            self.showPlainIcon()
+
     def setDisabledAnim(self, disable: bool):
         self.disable = disable
 
@@ -327,151 +2260,193 @@ class QIconSvg(QLabel):
             width, height = width.width(), width.height()
 
         self.size = (width, height)
+        self.icon_states.invalidate()
         self.leaveEvent(None)
 
     def setIcon(self, icon):
-        self.svg_path = icon
-        self.icon = QIcon(self.svg_path)
-        self.setPixmap(self.icon.pixmap(QSize(*self.size)))
+        self.svg_path = svg_pool.intern(icon)
+        self.renderer = renderer_registry.get(self.svg_path)
+        self.icon_states.invalidate()
+        self.atlas_icon = None
+        self.updateAnimation()
+        # QIcon only loads files, SVG strings go through the icon engine
+        self.icon = QIcon(SvgIconEngine(self.svg_path)) if is_svg_markup(self.svg_path) else QIcon(self.svg_path)
         self.setScaledContents(True)
-        QTimer.singleShot(100, partial(self.leaveEvent, None))
+        polish_scheduler.schedule(self)
 
-    def updateIcon(self, color):
-        if not color or not self.svg_path:
-            return
+    def showPlainIcon(self):
+        """Show the SVG with its own colors, used when no icon-color applies."""
+        self.setPixmap(self.icon.pixmap(QSize(*self.size)))
 
-        # Render SVG with the specified color
-        renderer = QSvgRenderer(self.svg_path)
-        pixmap = QPixmap(*self.size)  # Set desired icon size
-        pixmap.fill(Qt.transparent)
-        painter = QPainter(pixmap)
-        renderer.render(painter)
-        painter.setCompositionMode(QPainter.CompositionMode_SourceIn)
-        painter.fillRect(pixmap.rect(), color)
-        painter.save()
-        self.setPixmap(pixmap)
+    def stateIcon(self, pixmap):
+        return pixmap
 
-    def enterEvent(self, event):
+    def setStateIcon(self, icon: QIcon):
+        # icon engine and animation frames, the label shows them as a pixmap
+        self.state_icon = icon
+        self.setPixmap(icon.pixmap(QSize(*self.size), self.devicePixelRatioF()))
+
+    def showEngineState(self, state):
+        super().showEngineState(state)
+        self.setStateIcon(self.state_icon)
+
+    def showPlaceholder(self):
+        # the label keeps its previous pixmap until the first render is done
+        pass
+
+    def showIcon(self, icon):
+        if self.atlas:
+            self.atlas_icon = icon
+            self.update()
+        else:
+            self.setPixmap(icon)
+
+    def paintEvent(self, event):
+        if not self.atlas or not self.atlas_icon:
+            return super().paintEvent(event)
+
+        painter = QPainter(self)
+        self.drawFrame(painter)
+        page, source = icon_atlas.lookup(*self.atlas_icon)
+        painter.drawPixmap(QRectF(self.contentsRect()), page, source)
+
+    def setState(self, state):
         if not self.disable:
-            if not self.stylecode:
-                effective_style, self.stylecode = get_effective_style(self, hover=True)
-            else:
-                effective_style, _ = get_color(type(self).__name__, self.stylecode, hover=True)
-            self.updateIcon(effective_style)
+            super().setState(state)
+
+    def enterEvent(self, event):
+        self.setState("hover")
         super().enterEvent(event)
 
     def leaveEvent(self, event):
-        if not self.disable:
-            if not self.stylecode:
-                effective_style, self.stylecode = get_effective_style(self)
-            else:
-                effective_style, _ = get_color(type(self).__name__, self.stylecode)
-            self.updateIcon(effective_style)
+        self.setState("normal")
         super().leaveEvent(event)
 
     def mousePressEvent(self, event):
-        if not self.disable:
-            if not self.stylecode:
-                effective_style, self.stylecode = get_effective_style(self, pressed=True)
-            else:
-                effective_style, _ = get_color(type(self).__name__, self.stylecode, pressed=True)
-            self.updateIcon(effective_style)
+        self.setState("pressed")
         super().mousePressEvent(event)
 
     def mouseReleaseEvent(self, event):
-        if self.underMouse():
-            if not self.stylecode:
-                effective_style, self.stylecode = get_effective_style(self, hover=True)
-            else:
-                effective_style, _ = get_color(type(self).__name__, self.stylecode, hover=True)
-        else:
-            if not self.stylecode:
-                effective_style, self.stylecode = get_effective_style(self)
-            else:
-                effective_style, _ = get_color(type(self).__name__, self.stylecode)
-
-        if not self.disable:
-            self.updateIcon(effective_style)
-
+        self.setState("hover" if self.underMouse() else "normal")
         self.clicked.emit()
         super().mouseReleaseEvent(event)
 
 
-class QSvgButton(QPushButton):
+class QSvgButton(SvgStateMixin, QPushButton):
     enter = Signal()
     leave = Signal()
+    keep_aspect = True
 
     def __init__(self, svg_path: Optional[str] = None, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.size = (20, 20)
         self.svg_path = svg_path
-        self.stylecode = None
+        self.renderer = None
+        self.icon_states = IconStateTable()
+        self.atlas = ICON_ATLAS
+        self.async_render = ASYNC_RENDER
+        self.coalesce_hover = HOVER_COALESCING
+        self.lazy_render = LAZY_RENDER
+        self.icon_engine_mode = ICON_ENGINE
+        self.engine = None
+        self.animate = True
+        self.animated = False
+        self.animation_renderer = None
+        self.frame_shown = None
+        self.atlas_icon = None
+        self.icon_state = "normal"
         if self.svg_path:
             self.setSvg(self.svg_path)
 
     def event(self, e):
+        polish_scheduler.handleEvent(self, e)
+        animation_ticker.handleEvent(self, e)
         super().event(e)
-        if str(e.type()) == "Type.PaletteChange":
-            self.leaveEvent(None)
+        if style_cache.handleEvent(self, e):
+            self.icon_states.invalidate()
+            theme_coordinator.schedule(self)
         return True
 
+    def refreshIcon(self):
+        self.setState(self.icon_state)
+
     def setSvgSize(self, width: Union[int, QSize], height: Optional[int] = None):
         if isinstance(width, QSize):
             width, height = width.width(), width.height()
 
         self.setIconSize(QSize(width, height))
         self.size = (width, height)
+        self.icon_states.invalidate()
         self.leaveEvent(None)
 
     def setSvg(self, icon):
-        self.svg_path = icon
-        QTimer.singleShot(100, partial(self.leaveEvent, None))
-
-    def updateIcon(self, color):
-        if not color or not self.svg_path:
-            return
+        self.svg_path = svg_pool.intern(icon)
+        self.renderer = renderer_registry.get(self.svg_path)
+        self.icon_states.invalidate()
+        self.atlas_icon = None
+        self.updateAnimation()
+        polish_scheduler.schedule(self)
 
-        renderer = QSvgRenderer(self.svg_path)
-        pixmap = QPixmap(*self.size)  # Set desired icon size
-        pixmap.fill(Qt.transparent)
-        painter = QPainter(pixmap)
+    def setStateIcon(self, icon: QIcon):
+        # the icon size is only changed by setSvgSize
+        self.setIcon(icon)
 
-        renderer.setAspectRatioMode(Qt.KeepAspectRatio)
-
-        renderer.render(painter)
-        painter.setCompositionMode(QPainter.CompositionMode_SourceIn)
-        painter.fillRect(pixmap.rect(), color)
-        painter.save()
-        self.setIcon(QIcon(pixmap))
+    def paintEvent(self, event):
+        if not self.atlas or self.animated:
+            return super().paintEvent(event)
+        draw_atlas_push_button(self)
 
     def enterEvent(self, event):
         self.enter.emit()
-        effective_style, self.stylecode = get_effective_style(self, hover=True)
-        self.updateIcon(effective_style)
+        self.setState("hover")
         super().enterEvent(event)
 
     def leaveEvent(self, event):
         self.leave.emit()
-        effective_style, self.stylecode = get_effective_style(self)
-        self.updateIcon(effective_style)
+        self.setState("normal")
         if event:
             super().leaveEvent(event)
 
     def mousePressEvent(self, event):
-        effective_style, self.stylecode = get_effective_style(self, pressed=True)
-        self.updateIcon(effective_style)
+        self.setState("pressed")
         super().mousePressEvent(event)
 
     def mouseReleaseEvent(self, event):
-        if self.underMouse():
-            effective_style, self.stylecode = get_effective_style(self, hover=True)
-        else:
-            effective_style, self.stylecode = get_effective_style(self)
-
-        self.updateIcon(effective_style)
+        self.setState("hover" if self.underMouse() else "normal")
         super().mouseReleaseEvent(event)
 
 
+class SvgColorTemplate:
+    """
+    An SVG whose path fills are replaced by a color slot, parsed and serialized once.
+    The markup and the loaded renderer of every color are produced on first use and kept.
+    """
+
+    SLOT = "{svg-icon-color}"
+
+    def __init__(self, svg: str):
+        root = Et.fromstring(svg) if is_svg_markup(svg) else Et.parse(svg).getroot()
+        for element in root.findall('.//{*}path') + root.findall('.//{*}svg'):
+            element.set('fill', self.SLOT)
+        self.pieces = Et.tostring(root, encoding='unicode', method='xml').split(self.SLOT)
+        self.renderers = {}
+
+    def markup(self, color: Union[QColor, str]) -> str:
+        return QColor(color).name().join(self.pieces)
+
+    def renderer(self, color: Union[QColor, str]) -> QSvgRenderer:
+        name = QColor(color).name()
+        renderer = self.renderers.get(name)
+        if renderer is None:
+            renderer = self.renderers[name] = QSvgRenderer(QByteArray(self.markup(name).encode('utf-8')))
+        return renderer
+
+
+@lru_cache(maxsize=256)
+def svg_color_template(svg: str) -> SvgColorTemplate:
+    return SvgColorTemplate(svg)
+
+
 class QSvgButtonIcon(QSvgWidget):
     enter = Signal()
     leave = Signal()
@@ -482,20 +2457,26 @@ class QSvgButtonIcon(QSvgWidget):
         self.setContentsMargins(0, 0, 0, 0)
         self.size = (20, 20)
         self.svg_path = svg_path
-        self.stylecode = None
         self.closed = False
+        self.icon_state = "normal"
+        self.coalesce_hover = HOVER_COALESCING
 
-        self.tree = None
-        self.root = None
+        self.template = None
+        self.color = None
+        self.icon_renderer = None
         if self.svg_path:
             self.setSvg(self.svg_path)
 
     def event(self, e):
+        polish_scheduler.handleEvent(self, e)
         super().event(e)
-        if str(e.type()) == "Type.PaletteChange":
-            self.leaveEvent(None)
+        if style_cache.handleEvent(self, e):
+            theme_coordinator.schedule(self)
         return True
 
+    def refreshIcon(self):
+        self.leaveEvent(None)
+
     def setSvgSize(self, width: Union[int, QSize], height: Optional[int] = None):
         if isinstance(width, QSize):
             width, height = width.width(), width.height()
@@ -505,32 +2486,60 @@ class QSvgButtonIcon(QSvgWidget):
         self.leaveEvent(None)
 
     def setSvg(self, icon):
-        self.tree = Et.parse(icon)
-        self.root = self.tree.getroot()
-        self.svg_path = icon
-        QTimer.singleShot(100, partial(self.leaveEvent, None))
+        self.svg_path = svg_pool.intern(icon)
+        self.template = svg_color_template(self.svg_path)
+        self.color = None
+        # the SVG with its own colors until an icon-color applies
+        self.icon_renderer = renderer_registry.get(self.svg_path)
+        self.update()
+        polish_scheduler.schedule(self)
 
     def updateIcon(self, color):
         if not color or not self.svg_path:
             return
 
-        c = QColor(color)
-        paths = self.root.findall('.//{*}path')
-        paths2 = self.root.findall('.//{*}svg')
-        for path in paths + paths2:
-            path.set('fill', c.name())
+        color = QColor(color).name()
+        if color == self.color:
+            return
 
-        self.load(self.get_QByteArray())
+        self.color = color
+        self.icon_renderer = self.template.renderer(color)
         self.setFixedSize(*self.size)
+        self.update()
 
     def get_QByteArray(self):
-        xmlstr = Et.tostring(self.root, encoding='utf8', method='xml')
-        return QByteArray(xmlstr)
+        return QByteArray(self.template.markup(self.color).encode('utf-8'))
+
+    def renderer(self) -> QSvgRenderer:
+        """The renderer of the current color, shared by every QSvgButtonIcon showing it."""
+        return self.icon_renderer or super().renderer()
+
+    def paintEvent(self, event):
+        if self.icon_renderer is None:
+            return super().paintEvent(event)
+
+        painter = QPainter(self)
+        self.icon_renderer.setAspectRatioMode(Qt.AspectRatioMode.IgnoreAspectRatio)
+        self.icon_renderer.render(painter)
+
+    def setHoverCoalescing(self, enabled: bool):
+        """Apply state changes at most once per frame, dropping the states a fast sweep passes through."""
+        self.coalesce_hover = enabled
+
+    def setState(self, state):
+        """Color the SVG for the state, on the next frame in hover coalescing mode."""
+        self.icon_state = state
+        if self.coalesce_hover:
+            state_coalescer.schedule(self)
+        else:
+            self.applyState()
+
+    def applyState(self):
+        self.updateIcon(style_cache.states(self)[self.icon_state])
 
     def enterEvent(self, event):
         self.enter.emit()
-        effective_style, self.stylecode = get_effective_style(self, hover=True)
-        self.updateIcon(effective_style)
+        self.setState("hover")
         super().enterEvent(event)
 
     def leaveEvent(self, event):
@@ -540,14 +2549,12 @@ class QSvgButtonIcon(QSvgWidget):
             return
 
         self.leave.emit()
-        effective_style, self.stylecode = get_effective_style(self)
-        self.updateIcon(effective_style)
+        self.setState("normal")
         if event:
             super().leaveEvent(event)
 
     def mousePressEvent(self, event):
-        effective_style, self.stylecode = get_effective_style(self, pressed=True)
-        self.updateIcon(effective_style)
+        self.setState("pressed")
         super().mousePressEvent(event)
 
     def closeEvent(self, event):
@@ -559,26 +2566,36 @@ class QSvgButtonIcon(QSvgWidget):
         self.closed = True
 
     def mouseReleaseEvent(self, event):
-        if self.underMouse():
-            effective_style, self.stylecode = get_effective_style(self, hover=True)
-        else:
-            effective_style, self.stylecode = get_effective_style(self)
-
-        self.updateIcon(effective_style)
+        self.setState("hover" if self.underMouse() else "normal")
         super().mouseReleaseEvent(event)
         self.clicked.emit()
 
 
-class SVGRenderRadioButton(QRadioButton):
+class SVGRenderRadioButton(SvgStateMixin, QRadioButton):
     enter = Signal()
     leave = Signal()
+    svg_attribute = "svg_string"
+    size_attribute = "size_ic"
 
     def __init__(self, svg_string: Optional[str] = None, size_ic: Optional[Tuple[int, int]] = (25, 25), *args,
                  **kwargs):
         super().__init__(*args, **kwargs)
-        self.clear_cache = None
         self.size_ic = size_ic
-        self.svg_string = svg_string
+        self.svg_string = svg_pool.intern(svg_string)
+        self.renderer = None
+        self.icon_states = IconStateTable()
+        self.atlas = ICON_ATLAS
+        self.async_render = ASYNC_RENDER
+        self.coalesce_hover = HOVER_COALESCING
+        self.lazy_render = LAZY_RENDER
+        self.icon_engine_mode = ICON_ENGINE
+        self.engine = None
+        self.animate = True
+        self.animated = False
+        self.animation_renderer = None
+        self.frame_shown = None
+        self.atlas_icon = None
+        self.icon_state = "normal"
         self.closed = False
         self.set_string_svg(self.svg_string)
         self.setCheckable(False)
@@ -588,57 +2605,60 @@ class SVGRenderRadioButton(QRadioButton):
     def set_name(self, name):
         self.setObjectName(name)
         self.__class__.__name__ = name
+        self.icon_states.invalidate()
         self.leaveEvent()
 
     def event(self, e):
+        polish_scheduler.handleEvent(self, e)
+        animation_ticker.handleEvent(self, e)
         super().event(e)
-        if str(e.type()) == "Type.PaletteChange":
-            get_color.cache_clear()
-            self.clear_cache = None
-            self.after_load()
-            self.leaveEvent(None)
+        if style_cache.handleEvent(self, e):
+            self.icon_states.invalidate()
+            theme_coordinator.schedule(self)
         return True
 
+    def refreshIcon(self):
+        if not self.closed:
+            self.setState(self.icon_state)
+
     def setSvgSize(self, width: Union[int, QSize], height: Optional[int] = None):
         if isinstance(width, QSize):
             width, height = width.width(), width.height()
 
         self.size_ic = (width, height)
+        self.icon_states.invalidate()
         self.leaveEvent()
 
     def set_string_svg(self, icon):
         if not icon:
             return
 
-        self.svg_string = icon
-        QTimer.singleShot(100, partial(self.leaveEvent))
-        QTimer.singleShot(100, partial(self.after_load))
-
-    def after_load(self):
-        effective_style, self.clear_cache = get_effective_style(self, checked=True)
-        effective_style, self.clear_cache = get_effective_style(self, hover=True)
-        effective_style, self.clear_cache = get_effective_style(self, pressed=True)
-        effective_style, self.clear_cache = get_effective_style(self)
+        self.svg_string = svg_pool.intern(icon)
+        self.renderer = renderer_registry.get(self.svg_string)
+        self.icon_states.invalidate()
+        self.atlas_icon = None
+        self.updateAnimation()
 
-    def updateIcon(self, color):
-        if not color or not self.svg_string:
-            return
+        polish_scheduler.schedule(self)
 
-        pixel = svg_to_pixmap(self.svg_string, *self.size_ic, color)
-        self.setIcon(QIcon(pixel))
-        self.setIconSize(QSize(*self.size_ic))
+    def paintEvent(self, event):
+        if not self.atlas or self.animated:
+            return super().paintEvent(event)
+
+        painter = QStylePainter(self)
+        opt = QStyleOptionButton()
+        self.initStyleOption(opt)
+        opt.text, opt.icon = "", QIcon()
+        painter.drawControl(QStyle.ControlElement.CE_RadioButton, opt)
+        rect = self.style().subElementRect(QStyle.SubElement.SE_RadioButtonContents, opt, self)
+        draw_atlas_label(painter, self, rect, self.atlas_icon, self.text(), self.icon_state,
+                         Qt.AlignmentFlag.AlignLeft)
 
     def enterEvent(self, event=None):
         self.enter.emit()
-        if self.clear_cache:
-            effective_style, _ = get_color(type(self).__name__, self.clear_cache,
-                                           hover=True if not self.isChecked() else False, checked=self.isChecked())
-        else:
-            effective_style, self.clear_cache = get_effective_style(self, hover=True if not self.isChecked() else False,
-                                                                    checked=self.isChecked())
         if event:
             super().enterEvent(event)
-        self.updateIcon(effective_style)
+        self.setState("checked" if self.isChecked() else "hover")
 
     def leaveEvent(self, event=None):
         if self.closed:
@@ -650,21 +2670,12 @@ class SVGRenderRadioButton(QRadioButton):
         except RuntimeError:
             return
 
-        if self.clear_cache:
-            effective_style, _ = get_color(type(self).__name__, self.clear_cache, checked=self.isChecked())
-        else:
-            effective_style, self.clear_cache = get_effective_style(self, checked=self.isChecked())
         if event:
             super().leaveEvent(event)
-        self.updateIcon(effective_style)
+        self.setState("checked" if self.isChecked() else "normal")
 
     def mousePressEvent(self, event):
-        if self.clear_cache:
-            effective_style, _ = get_color(type(self).__name__, self.clear_cache, pressed=True)
-        else:
-            effective_style, self.clear_cache = get_effective_style(self, pressed=True)
-
-        self.updateIcon(effective_style)
+        self.setState("pressed")
         super().mousePressEvent(event)
 
     def closeEvent(self, event):
@@ -676,31 +2687,35 @@ class SVGRenderRadioButton(QRadioButton):
         self.closed = True
 
     def mouseReleaseEvent(self, event):
-        if self.underMouse():
-            if self.clear_cache:
-                effective_style, _ = get_color(type(self).__name__, self.clear_cache, hover=True)
-            else:
-                effective_style, self.clear_cache = get_effective_style(self, hover=True)
-        else:
-            if self.clear_cache:
-                effective_style, _ = get_color(type(self).__name__, self.clear_cache)
-            else:
-                effective_style, self.clear_cache = get_effective_style(self)
-
-        self.updateIcon(effective_style)
+        self.setState("hover" if self.underMouse() else "normal")
         super().mouseReleaseEvent(event)
 
 
-class SVGRenderButton(QToolButton):
+class SVGRenderButton(SvgStateMixin, QToolButton):
     enter = Signal()
     leave = Signal()
+    svg_attribute = "svg_string"
+    size_attribute = "size_ic"
 
     def __init__(self, svg_string: Optional[str] = None, size_ic: Optional[Tuple[int, int]] = (25, 25), *args,
                  **kwargs):
         super().__init__(*args, **kwargs)
-        self.clear_cache = None
         self.size_ic = size_ic
-        self.svg_string = svg_string
+        self.svg_string = svg_pool.intern(svg_string)
+        self.renderer = None
+        self.icon_states = IconStateTable()
+        self.atlas = ICON_ATLAS
+        self.async_render = ASYNC_RENDER
+        self.coalesce_hover = HOVER_COALESCING
+        self.lazy_render = LAZY_RENDER
+        self.icon_engine_mode = ICON_ENGINE
+        self.engine = None
+        self.animate = True
+        self.animated = False
+        self.animation_renderer = None
+        self.frame_shown = None
+        self.atlas_icon = None
+        self.icon_state = "normal"
         self.closed = False
         self.set_string_svg(self.svg_string)
         self.setCursor(Qt.CursorShape.PointingHandCursor)
@@ -708,60 +2723,62 @@ class SVGRenderButton(QToolButton):
     def set_name(self, name):
         self.setObjectName(name)
         self.__class__.__name__ = name
+        self.icon_states.invalidate()
         self.leaveEvent()
 
     def event(self, e):
+        polish_scheduler.handleEvent(self, e)
+        animation_ticker.handleEvent(self, e)
         super().event(e)
 
-        if str(e.type()) == "Type.PaletteChange":
-            get_color.cache_clear()
-            self.clear_cache = None
-            self.after_load()
-            self.leaveEvent(None)
+        if style_cache.handleEvent(self, e):
+            self.icon_states.invalidate()
+            theme_coordinator.schedule(self)
         return True
 
+    def refreshIcon(self):
+        if not self.closed:
+            self.setState(self.icon_state)
+
     def setSvgSize(self, width: Union[int, QSize], height: Optional[int] = None):
         if isinstance(width, QSize):
             width, height = width.width(), width.height()
 
         self.size_ic = (width, height)
+        self.icon_states.invalidate()
         self.leaveEvent()
 
     def set_string_svg(self, icon):
         if not icon:
             return
 
-        self.svg_string = icon
-
-        QTimer.singleShot(100, partial(self.leaveEvent))
-        QTimer.singleShot(100, partial(self.after_load))
-
-    def after_load(self):
-        if self.closed:
-            return
-
-        effective_style, self.clear_cache = get_effective_style(self, checked=True)
-        effective_style, self.clear_cache = get_effective_style(self, hover=True)
-        effective_style, self.clear_cache = get_effective_style(self, pressed=True)
-        effective_style, self.clear_cache = get_effective_style(self)
+        self.svg_string = svg_pool.intern(icon)
+        self.renderer = renderer_registry.get(self.svg_string)
+        self.icon_states.invalidate()
+        self.atlas_icon = None
+        self.updateAnimation()
 
-    def updateIcon(self, color):
-        if not color or not self.svg_string:
-            return
+        polish_scheduler.schedule(self)
 
-        pixel = svg_to_pixmap(self.svg_string, *self.size_ic, color)
-        self.setIcon(QIcon(pixel))
-        self.setIconSize(QSize(*self.size_ic))
+    def paintEvent(self, event):
+        if not self.atlas or self.animated:
+            return super().paintEvent(event)
+
+        painter = QStylePainter(self)
+        opt = QStyleOptionToolButton()
+        self.initStyleOption(opt)
+        opt.text, opt.icon = "", QIcon()
+        painter.drawComplexControl(QStyle.ComplexControl.CC_ToolButton, opt)
+        rect = self.style().subControlRect(QStyle.ComplexControl.CC_ToolButton, opt,
+                                           QStyle.SubControl.SC_ToolButton, self)
+        text = "" if self.toolButtonStyle() == Qt.ToolButtonStyle.ToolButtonIconOnly else self.text()
+        draw_atlas_label(painter, self, rect, self.atlas_icon, text, self.icon_state)
 
     def enterEvent(self, event=None):
         self.enter.emit()
-        if self.clear_cache:
-            effective_style, _ = get_color(type(self).__name__, self.clear_cache, hover=True)
-        else:
-            effective_style, self.clear_cache = get_effective_style(self, hover=True)
         if event:
             super().enterEvent(event)
-        self.updateIcon(effective_style)
+        self.setState("hover")
 
     def leaveEvent(self, event=None):
         if self.closed:
@@ -774,21 +2791,12 @@ class SVGRenderButton(QToolButton):
         except RuntimeError:
             return
 
-        if self.clear_cache:
-            effective_style, _ = get_color(type(self).__name__, self.clear_cache, checked=self.isChecked())
-        else:
-            effective_style, self.clear_cache = get_effective_style(self, checked=self.isChecked())
         if event:
             super().leaveEvent(event)
-        self.updateIcon(effective_style)
+        self.setState("checked" if self.isChecked() else "normal")
 
     def mousePressEvent(self, event):
-        if self.clear_cache:
-            effective_style, _ = get_color(type(self).__name__, self.clear_cache, pressed=True)
-        else:
-            effective_style, self.clear_cache = get_effective_style(self, pressed=True)
-
-        self.updateIcon(effective_style)
+        self.setState("pressed")
         super().mousePressEvent(event)
 
     def closeEvent(self, event):
@@ -800,31 +2808,35 @@ class SVGRenderButton(QToolButton):
         self.closed = True
 
     def mouseReleaseEvent(self, event):
-        if self.underMouse():
-            if self.clear_cache:
-                effective_style, _ = get_color(type(self).__name__, self.clear_cache, hover=True)
-            else:
-                effective_style, self.clear_cache = get_effective_style(self, hover=True)
-        else:
-            if self.clear_cache:
-                effective_style, _ = get_color(type(self).__name__, self.clear_cache)
-            else:
-                effective_style, self.clear_cache = get_effective_style(self)
-
-        self.updateIcon(effective_style)
+        self.setState("hover" if self.underMouse() else "normal")
         super().mouseReleaseEvent(event)
 
 
-class SVGRenderIcon(QPushButton):
+class SVGRenderIcon(SvgStateMixin, QPushButton):
     enter = Signal()
     leave = Signal()
+    svg_attribute = "svg_string"
+    size_attribute = "size_ic"
 
     def __init__(self, svg_string: Optional[str] = None, size_ic: Optional[Tuple[int, int]] = (25, 25), *args,
                  **kwargs):
         super().__init__(*args, **kwargs)
-        self.clear_cache = None
         self.size_ic = size_ic
-        self.svg_string = svg_string
+        self.svg_string = svg_pool.intern(svg_string)
+        self.renderer = None
+        self.icon_states = IconStateTable()
+        self.atlas = ICON_ATLAS
+        self.async_render = ASYNC_RENDER
+        self.coalesce_hover = HOVER_COALESCING
+        self.lazy_render = LAZY_RENDER
+        self.icon_engine_mode = ICON_ENGINE
+        self.engine = None
+        self.animate = True
+        self.animated = False
+        self.animation_renderer = None
+        self.frame_shown = None
+        self.atlas_icon = None
+        self.icon_state = "normal"
         self.closed = False
         self.set_string_svg(self.svg_string)
         self.setCursor(Qt.CursorShape.PointingHandCursor)
@@ -832,56 +2844,52 @@ class SVGRenderIcon(QPushButton):
     def set_name(self, name):
         self.setObjectName(name)
         self.__class__.__name__ = name
+        self.icon_states.invalidate()
         self.leaveEvent()
 
     def event(self, e):
+        polish_scheduler.handleEvent(self, e)
+        animation_ticker.handleEvent(self, e)
         super().event(e)
-        if str(e.type()) == "Type.PaletteChange":
-            get_color.cache_clear()
-            self.clear_cache = None
-            self.after_load()
-            self.leaveEvent(None)
+        if style_cache.handleEvent(self, e):
+            self.icon_states.invalidate()
+            theme_coordinator.schedule(self)
         return True
 
+    def refreshIcon(self):
+        if not self.closed:
+            self.setState(self.icon_state)
+
     def setSvgSize(self, width: Union[int, QSize], height: Optional[int] = None):
         if isinstance(width, QSize):
             width, height = width.width(), width.height()
 
         self.size_ic = (width, height)
+        self.icon_states.invalidate()
         self.leaveEvent()
 
     def set_string_svg(self, icon):
         if not icon:
             return
 
-        self.svg_string = icon
-
-        QTimer.singleShot(100, partial(self.leaveEvent))
-        QTimer.singleShot(100, partial(self.after_load))
+        self.svg_string = svg_pool.intern(icon)
+        self.renderer = renderer_registry.get(self.svg_string)
+        self.icon_states.invalidate()
+        self.atlas_icon = None
+        self.updateAnimation()
 
-    def after_load(self):
-        effective_style, self.clear_cache = get_effective_style(self, checked=True)
-        effective_style, self.clear_cache = get_effective_style(self, hover=True)
-        effective_style, self.clear_cache = get_effective_style(self, pressed=True)
-        effective_style, self.clear_cache = get_effective_style(self)
+        polish_scheduler.schedule(self)
 
-    def updateIcon(self, color):
-        if not color or not self.svg_string:
-            return
-
-        pixel = svg_to_pixmap(self.svg_string, *self.size_ic, color)
-        self.setIcon(QIcon(pixel))
-        self.setIconSize(QSize(*self.size_ic))
+    def paintEvent(self, event):
+        if not self.atlas or self.animated:
+            return super().paintEvent(event)
+        draw_atlas_push_button(self)
 
     def enterEvent(self, event=None):
         self.enter.emit()
-        if self.clear_cache:
-            effective_style, _ = get_color(type(self).__name__, self.clear_cache, hover=True)
-        else:
-            effective_style, self.clear_cache = get_effective_style(self, hover=True)
         if event:
             super().enterEvent(event)
-        self.updateIcon(effective_style)
+        self.setState("hover")
 
     def leaveEvent(self, event=None):
         if self.closed:
@@ -894,21 +2902,12 @@ class SVGRenderIcon(QPushButton):
         except RuntimeError:
             return
 
-        if self.clear_cache:
-            effective_style, _ = get_color(type(self).__name__, self.clear_cache, checked=self.isChecked())
-        else:
-            effective_style, self.clear_cache = get_effective_style(self, checked=self.isChecked())
         if event:
             super().leaveEvent(event)
-        self.updateIcon(effective_style)
+        self.setState("checked" if self.isChecked() else "normal")
 
     def mousePressEvent(self, event):
-        if self.clear_cache:
-            effective_style, _ = get_color(type(self).__name__, self.clear_cache, pressed=True)
-        else:
-            effective_style, self.clear_cache = get_effective_style(self, pressed=True)
-
-        self.updateIcon(effective_style)
+        self.setState("pressed")
         super().mousePressEvent(event)
 
     def closeEvent(self, event):
@@ -924,16 +2923,368 @@ class SVGRenderIcon(QPushButton):
         self.closed = True
 
     def mouseReleaseEvent(self, event):
-        if self.underMouse():
-            if self.clear_cache:
-                effective_style, _ = get_color(type(self).__name__, self.clear_cache, hover=True)
-            else:
-                effective_style, self.clear_cache = get_effective_style(self, hover=True)
-        else:
-            if self.clear_cache:
-                effective_style, _ = get_color(type(self).__name__, self.clear_cache)
-            else:
-                effective_style, self.clear_cache = get_effective_style(self)
-
-        self.updateIcon(effective_style)
+        self.setState("hover" if self.underMouse() else "normal")
         super().mouseReleaseEvent(event)
+
+
+class SvgItemDelegate(QStyledItemDelegate):
+    """
+    Item delegate for QListView, QTreeView and QTableView that paints the SVG of an item with its text.
+
+    The SVG path or markup is read from svg_role, items whose data there is not a string are
+    painted by QStyledItemDelegate. Icon and text colors come from the icon-color and color rules
+    of the delegate's class name in the stylesheets of the view and its parents, the same as for the
+    widgets: hover follows the mouse, pressed the item under a held mouse button and checked the
+    checked or selected items. Pixmaps are taken from the shared icon cache, so only the icons of
+    the rows that are painted are rendered, once per SVG, size and color.
+    """
+
+    def __init__(self, parent: Optional[QObject] = None, svg_role=Qt.ItemDataRole.DecorationRole, keep_aspect: bool = False):
+        super().__init__(parent)
+        self.svg_role = svg_role
+        self.keep_aspect = keep_aspect
+        self.icon_size = None
+        self.pressed = QPersistentModelIndex()
+        self.watched = weakref.WeakSet()
+
+    def setIconSize(self, width: int, height: int):
+        """Icon size of every item, the iconSize of the view by default."""
+        self.icon_size = QSize(width, height)
+
+    def setSvgRole(self, role):
+        self.svg_role = role
+
+    def watch(self, view: QWidget):
+        """Follow the style changes and mouse releases of the view the delegate paints for."""
+        if view is None or view in self.watched:
+            return
+
+        self.watched.add(view)
+        view.installEventFilter(self)
+        if hasattr(view, "viewport"):
+            view.viewport().installEventFilter(self)
+
+    def eventFilter(self, watched, event):
+        style_cache.handleEvent(watched, event)
+        if event.type() == QEvent.Type.MouseButtonRelease and self.pressed.isValid():
+            self.pressed = QPersistentModelIndex()
+            watched.update()
+        return False
+
+    def itemState(self, option: QStyleOptionViewItem, index) -> str:
+        # a pressed item is always under the mouse too: pressed > checked/selected > hover > normal
+        if option.state & QStyle.StateFlag.State_Sunken or (
+                self.pressed.isValid() and self.pressed == QPersistentModelIndex(index)):
+            return "pressed"
+        if option.state & QStyle.StateFlag.State_Selected or \
+                index.data(Qt.ItemDataRole.CheckStateRole) == Qt.CheckState.Checked:
+            return "checked"
+        if option.state & QStyle.StateFlag.State_MouseOver:
+            return "hover"
+        return "normal"
+
+    def iconPixmap(self, svg: str, size: QSize, color: Optional[str], dpr: float) -> QPixmap:
+        if color:
+            return cached_svg_pixmap(svg, size.width(), size.height(), color, dpr, self.keep_aspect)
+
+        # no icon-color rule, the SVG keeps its own colors
+        key = svg_digest(svg), size.width(), size.height(), None, dpr, self.keep_aspect, SUPERSAMPLING
+        pixmap = icon_cache.get(key)
+        if pixmap is None:
+            pixmap = QPixmap(size * dpr)
+            pixmap.setDevicePixelRatio(dpr)
+            pixmap.fill(Qt.GlobalColor.transparent)
+            painter = QPainter(pixmap)
+            paint_svg(painter, QRectF(0, 0, size.width(), size.height()), svg, None, self.keep_aspect)
+            painter.end()
+            icon_cache.put(key, pixmap)
+        return pixmap
+
+    def initStyleOption(self, option: QStyleOptionViewItem, index):
+        super().initStyleOption(option, index)
+        if isinstance(index.data(self.svg_role), str):
+            # room for the icon is kept by the layout of the style, paint() draws it
+            option.features |= QStyleOptionViewItem.ViewItemFeature.HasDecoration
+            option.icon = QIcon()
+            if self.icon_size is not None:
+                option.decorationSize = self.icon_size
+
+    def paint(self, painter, option, index):
+        svg = index.data(self.svg_role)
+        if not isinstance(svg, str):
+            return super().paint(painter, option, index)
+
+        svg = svg_pool.intern(svg)
+        view = option.widget
+        self.watch(view)
+        opt = QStyleOptionViewItem(option)
+        self.initStyleOption(opt, index)
+
+        state = self.itemState(opt, index)
+        name = type(self).__name__
+        icon_color = text_color = None
+        if view is not None:
+            icon_states = style_cache.states(view, "icon-color", name)
+            text_states = style_cache.states(view, "color", name)
+            icon_color = icon_states.get(state) or icon_states.get("normal")
+            text_color = text_states.get(state) or text_states.get("normal")
+        if text_color:
+            opt.palette.setColor(QPalette.ColorRole.Text, QColor(text_color))
+            opt.palette.setColor(QPalette.ColorRole.HighlightedText, QColor(text_color))
+
+        style = view.style() if view is not None else QApplication.style()
+        style.drawControl(QStyle.ControlElement.CE_ItemViewItem, opt, painter, view)
+
+        rect = style.subElementRect(QStyle.SubElement.SE_ItemViewItemDecoration, opt, view)
+        rect = QStyle.alignedRect(opt.direction, opt.decorationAlignment, opt.decorationSize, rect)
+        dpr = view.devicePixelRatioF() if view is not None else painter.device().devicePixelRatioF()
+        painter.drawPixmap(rect.topLeft(), self.iconPixmap(svg, opt.decorationSize, icon_color, dpr))
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.Type.MouseButtonPress:
+            self.pressed = QPersistentModelIndex(index)
+            if option.widget is not None:
+                option.widget.viewport().update(option.rect)
+        return super().editorEvent(event, model, option, index)
+
+
+RENDER_TIME_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100)
+INSTRUMENTED_FUNCTIONS = ("svg_to_pixmap", "render_svg_mask")
+INSTRUMENTED_METHODS = ("updateIcon", "renderStateIcon", "refreshIcon", "applyState", "showIcon", "iconPixmap")
+
+
+def style_walk_depth(init_widget: QWidget, object_name: str, states, style_filters=("icon-color",)) -> int:
+    """Number of widgets a style lookup visits from init_widget until every state is resolved or no parent is left."""
+    missing = {(state, style_filter) for state in states for style_filter in style_filters}
+    depth = 0
+    current_widget = init_widget
+    while current_widget and missing:
+        try:
+            depth += 1
+            style_sheet = current_widget.styleSheet()
+            if style_sheet and object_name in style_sheet:
+                index = compile_style_sheet(style_sheet)
+                missing = {(state, style_filter) for state, style_filter in missing
+                           if not index.properties(object_name, state).get(style_filter)}
+            current_widget = current_widget.parentWidget()
+        except RuntimeError:
+            break
+    return depth
+
+
+class RenderStats(QObject):
+    """
+    Counters of icon rendering and style lookups, broken down by widget class and object name.
+
+    Disabled it costs nothing: enable() swaps the module functions svg_to_pixmap, render_svg_mask,
+    get_color, get_effective_style and get_effective_properties, StyleCache.states and the icon methods
+    of the widgets for counting wrappers, disable() puts the originals back. Calls made inside a
+    widget method are counted for that widget. With an interval, report() is emitted through
+    updated every interval ms.
+    """
+    updated = Signal(dict)
+
+    def __init__(self):
+        super().__init__()
+        self.enabled = False
+        self.patched = []
+        # the widget whose method is running, per thread since asynchronous renders count too
+        self.current = threading.local()
+        self.timer = None
+        self.reset()
+
+    def reset(self):
+        self.calls = {}
+        self.render_times = {}
+        self.lookups = {}
+        self.walk_depths = {}
+
+    @property
+    def owner(self) -> tuple:
+        return getattr(self.current, "owner", ("", ""))
+
+    def count(self, name: str, owner: Optional[tuple] = None):
+        owner = owner or self.owner
+        counter = self.calls.get(owner)
+        if counter is None:
+            counter = self.calls[owner] = Counter()
+        counter[name] += 1
+
+    def time(self, name: str, elapsed_ms: float, owner: Optional[tuple] = None):
+        key = (name, owner or self.owner)
+        histogram = self.render_times.get(key)
+        if histogram is None:
+            histogram = self.render_times[key] = {"count": 0, "total_ms": 0.0, "max_ms": 0.0,
+                                                   "buckets": [0] * (len(RENDER_TIME_BUCKETS) + 1)}
+        histogram["count"] += 1
+        histogram["total_ms"] += elapsed_ms
+        histogram["max_ms"] = max(histogram["max_ms"], elapsed_ms)
+        bucket = 0
+        while bucket < len(RENDER_TIME_BUCKETS) and elapsed_ms > RENDER_TIME_BUCKETS[bucket]:
+            bucket += 1
+        histogram["buckets"][bucket] += 1
+
+    def lookup(self, name: str, hit: bool, owner: Optional[tuple] = None):
+        key = (name, owner or self.owner)
+        hits, misses = self.lookups.get(key, (0, 0))
+        self.lookups[key] = (hits + 1, misses) if hit else (hits, misses + 1)
+
+    def walk(self, init_widget: QWidget, depth: int, func, *args):
+        """Record the depth of a style walk and run it on behalf of the widget."""
+        owner = self.widgetOwner(init_widget)
+        depths = self.walk_depths.get(owner)
+        if depths is None:
+            depths = self.walk_depths[owner] = Counter()
+        depths[depth] += 1
+
+        previous = self.owner
+        self.current.owner = owner
+        try:
+            return func(init_widget, *args)
+        finally:
+            self.current.owner = previous
+
+    @staticmethod
+    def widgetOwner(widget) -> tuple:
+        try:
+            return type(widget).__name__, widget.objectName()
+        except RuntimeError:
+            return type(widget).__name__, ""
+
+    def timedFunction(self, name: str, func):
+        def wrapper(*args, **kwargs):
+            owner = self.owner
+            self.count(name, owner)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.time(name, (time.perf_counter() - start) * 1000, owner)
+        return wrapper
+
+    def widgetMethod(self, name: str, func):
+        def wrapper(widget, *args, **kwargs):
+            previous = self.owner
+            self.current.owner = self.widgetOwner(widget)
+            self.count(name)
+            try:
+                return func(widget, *args, **kwargs)
+            finally:
+                self.current.owner = previous
+        return wrapper
+
+    def colorLookup(self, func):
+        def wrapper(*args, **kwargs):
+            misses = func.cache_info().misses
+            result = func(*args, **kwargs)
+            self.lookup("get_color", func.cache_info().misses == misses)
+            return result
+        wrapper.cache_info = func.cache_info
+        wrapper.cache_clear = func.cache_clear
+        return wrapper
+
+    def styleCacheLookup(self, func):
+        def wrapper(cache, widget, style_filter="icon-color", object_name=None):
+            entry = cache._widgets.get(widget)
+            hit = entry is not None and style_filter in entry.get(object_name or type(widget).__name__, {})
+            self.lookup("style_cache", hit, self.widgetOwner(widget))
+            return func(cache, widget, style_filter, object_name)
+        return wrapper
+
+    def styleWalk(self, func):
+        def wrapper(init_widget, hover=False, pressed=False, checked=False, style_filter="icon-color"):
+            depth = style_walk_depth(init_widget, type(init_widget).__name__, (style_state(hover, pressed, checked),),
+                                     (style_filter,))
+            return self.walk(init_widget, depth, func, hover, pressed, checked, style_filter)
+        return wrapper
+
+    def propertiesWalk(self, func):
+        def wrapper(init_widget, style_filters=STYLE_PROPERTIES, object_name=None):
+            depth = style_walk_depth(init_widget, object_name or type(init_widget).__name__,
+                                     ("normal",) + PSEUDO_STATES, style_filters)
+            return self.walk(init_widget, depth, func, style_filters, object_name)
+        return wrapper
+
+    def patch(self, target, attribute: str, wrapper):
+        self.patched.append((target, attribute, getattr(target, attribute)))
+        setattr(target, attribute, wrapper)
+
+    def enable(self, interval: Optional[int] = None):
+        """Start counting, emitting updated every interval ms if given."""
+        if not self.enabled:
+            module = sys.modules[__name__]
+            self.enabled = True
+            for name in INSTRUMENTED_FUNCTIONS:
+                self.patch(module, name, self.timedFunction(name, getattr(module, name)))
+            self.patch(module, "get_color", self.colorLookup(get_color))
+            self.patch(module, "get_effective_style", self.styleWalk(get_effective_style))
+            self.patch(module, "get_effective_properties", self.propertiesWalk(get_effective_properties))
+            self.patch(StyleCache, "states", self.styleCacheLookup(StyleCache.states))
+            for cls in (SvgStateMixin, QDropButton, QIconSvg, QSvgButton, QSvgButtonIcon, SVGRenderRadioButton,
+                        SVGRenderButton, SVGRenderIcon, SvgItemDelegate):
+                for name in INSTRUMENTED_METHODS:
+                    if name in cls.__dict__:
+                        self.patch(cls, name, self.widgetMethod(name, cls.__dict__[name]))
+
+        if self.timer is not None:
+            self.timer.stop()
+            self.timer = None
+        if interval:
+            self.timer = QTimer(self)
+            self.timer.timeout.connect(lambda: self.updated.emit(self.report()))
+            self.timer.start(interval)
+
+    def disable(self):
+        """Stop counting and restore the original functions. The collected numbers are kept."""
+        for target, attribute, original in reversed(self.patched):
+            setattr(target, attribute, original)
+        self.patched.clear()
+        self.enabled = False
+        if self.timer is not None:
+            self.timer.stop()
+            self.timer = None
+
+    def report(self) -> dict:
+        """
+        The collected numbers as plain data:
+        widgets: {class: {object name: {call: count}}}, render_ms: {class: {object name: {function: histogram}}},
+        lookups: {cache: {hits, misses, hit_rate, widgets: {class: {object name: (hits, misses)}}}},
+        walk_depth: {class: {object name: {depth: count}}}.
+        Calls made outside a widget are listed under an empty class name.
+        """
+        widgets = {}
+        for (class_name, object_name), counter in self.calls.items():
+            widgets.setdefault(class_name, {})[object_name] = dict(counter)
+
+        lookups = {}
+        for (name, (class_name, object_name)), (hits, misses) in self.lookups.items():
+            total = lookups.setdefault(name, {"hits": 0, "misses": 0, "hit_rate": 0.0, "widgets": {}})
+            total["hits"] += hits
+            total["misses"] += misses
+            total["widgets"].setdefault(class_name, {})[object_name] = (hits, misses)
+        for total in lookups.values():
+            total["hit_rate"] = total["hits"] / max(1, total["hits"] + total["misses"])
+
+        render_ms = {}
+        for (name, (class_name, object_name)), histogram in self.render_times.items():
+            render_ms.setdefault(class_name, {}).setdefault(object_name, {})[name] = dict(
+                histogram, buckets=dict(zip(RENDER_TIME_BUCKETS + (float("inf"),), histogram["buckets"])))
+
+        walk_depth = {}
+        for (class_name, object_name), depths in self.walk_depths.items():
+            walk_depth.setdefault(class_name, {})[object_name] = dict(sorted(depths.items()))
+
+        return {"widgets": widgets, "render_ms": render_ms, "lookups": lookups, "walk_depth": walk_depth}
+
+
+render_stats = RenderStats()
+
+
+def enable_instrumentation(interval: Optional[int] = None) -> RenderStats:
+    """Count renders and style lookups from now on, see RenderStats."""
+    render_stats.enable(interval)
+    return render_stats
+
+
+def disable_instrumentation():
+    render_stats.disable()
@@ -1,4 +1,5 @@
 from .QAbstract import (
     QSvgButton, QIconSvg, QDropButton, QSvgButtonIcon,
-    SVGRenderButton, SVGRenderIcon, SVGRenderRadioButton
+    SVGRenderButton, SVGRenderIcon, SVGRenderRadioButton,
+    SvgItemDelegate
 )
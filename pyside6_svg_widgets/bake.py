@@ -0,0 +1,107 @@
+"""
+Pre-rasterize a directory of SVG icons for every size, device pixel ratio and color.
+
+    python -m pyside6_svg_widgets.bake icons/ baked/ --sizes 20 25 --dprs 1 2 --qss style.qss
+
+Point QAbstract.BAKED_ICONS_DIR at the output directory and the widgets load these
+files instead of rendering the icons at runtime.
+"""
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+from multiprocessing import get_context
+from typing import List, Optional
+
+from PySide6.QtGui import QGuiApplication
+
+from .QAbstract import compile_style_sheet, icon_key, baked_icon_name, svg_to_image
+
+
+def init_worker():
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    if QGuiApplication.instance() is None:
+        init_worker.app = QGuiApplication([])
+
+
+def bake_icon(job) -> str:
+    svg, width, height, color, dpr, keep_aspect, path = job
+    image = svg_to_image(svg, width, height, color, dpr, keep_aspect)
+    if not image.save(path, "PNG"):
+        raise OSError(f"Can't write {path}")
+    return path
+
+
+def qss_colors(qss_path: str) -> List[str]:
+    with open(qss_path, encoding="utf-8") as f:
+        return compile_style_sheet(f.read()).values("icon-color")
+
+
+def find_svgs(svg_dir: str) -> List[str]:
+    svgs = []
+    for root, _, files in os.walk(svg_dir):
+        svgs.extend(os.path.join(root, name) for name in files if name.lower().endswith(".svg"))
+    return sorted(svgs)
+
+
+def bake(
+        svg_dir: str,
+        out_dir: str,
+        sizes: List[int],
+        dprs: List[float],
+        colors: List[str],
+        keep_aspect: bool = False,
+        jobs: Optional[int] = None,
+        force: bool = False
+) -> int:
+    """Render every combination into out_dir, skipping files that already exist. Returns the number rendered."""
+    os.makedirs(out_dir, exist_ok=True)
+
+    work = []
+    # identical SVGs or repeated sizes and colors map to the same file, render it once
+    seen = set()
+    for svg, size, dpr, color in product(find_svgs(svg_dir), sizes, dprs, colors):
+        path = os.path.join(out_dir, baked_icon_name(icon_key(svg, size, size, color, dpr, keep_aspect)))
+        if path in seen:
+            continue
+        seen.add(path)
+        if force or not os.path.exists(path):
+            work.append((svg, size, size, color, dpr, keep_aspect, path))
+
+    if not work:
+        return 0
+
+    with ProcessPoolExecutor(max_workers=jobs, mp_context=get_context("spawn"), initializer=init_worker) as pool:
+        for _ in pool.map(bake_icon, work, chunksize=max(1, len(work) // ((jobs or os.cpu_count() or 1) * 4))):
+            pass
+    return len(work)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m pyside6_svg_widgets.bake", description=__doc__.strip().split("\n")[0])
+    parser.add_argument("svg_dir", help="directory searched recursively for .svg files")
+    parser.add_argument("out_dir", help="directory the PNG files are written to")
+    parser.add_argument("--sizes", type=int, nargs="+", required=True, help="icon sizes in logical pixels")
+    parser.add_argument("--dprs", type=float, nargs="+", default=[1.0], help="device pixel ratios")
+    parser.add_argument("--colors", nargs="+", default=[], help="icon colors")
+    parser.add_argument("--qss", action="append", default=[], help="stylesheet to take icon-color values from")
+    parser.add_argument("--keep-aspect", action="store_true", help="keep the aspect ratio, as QSvgButton does")
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes, all cores by default")
+    parser.add_argument("--force", action="store_true", help="render icons that already exist again")
+    args = parser.parse_args(argv)
+
+    colors = list(args.colors)
+    for qss in args.qss:
+        colors.extend(qss_colors(qss))
+    colors = list(dict.fromkeys(colors))
+    if not colors:
+        parser.error("no colors given, pass --colors or a --qss file with icon-color rules")
+
+    count = bake(args.svg_dir, args.out_dir, args.sizes, args.dprs, colors, args.keep_aspect, args.jobs, args.force)
+    print(f"Baked {count} icons into {args.out_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,368 @@
+"""
+Headless benchmarks for the widgets in QAbstract, written as JSON.
+
+    python -m pyside6_svg_widgets.benchmark --output results.json
+    python -m pyside6_svg_widgets.benchmark --output new.json --baseline results.json
+
+Runs on the offscreen platform unless QT_QPA_PLATFORM says otherwise. With --baseline, every
+result slower than the baseline by more than --threshold is listed and the exit code is 1.
+"""
+import argparse
+import gc
+import itertools
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, List, Optional
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import PySide6
+from PySide6.QtCore import Qt, QEvent, QPointF, qVersion
+from PySide6.QtGui import QEnterEvent, QMouseEvent, QPalette, QColor
+from PySide6.QtWidgets import QApplication, QWidget
+
+from .QAbstract import (
+    QDropButton, QIconSvg, QSvgButton, QSvgButtonIcon, SVGRenderRadioButton, SVGRenderButton, SVGRenderIcon,
+    get_color, compile_style_sheet, render_svg_mask, svg_to_pixmap, cached_svg_pixmap, icon_cache, style_cache,
+    theme_coordinator, polish_scheduler, state_coalescer, render_stats
+)
+
+SVG = (
+    '<svg xmlns="http://www.w3.org/2000/svg" width="24" height="24" viewBox="0 0 24 24" fill="none" '
+    'stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round">'
+    '<path d="m6 14 1.45-2.9A2 2 0 0 1 9.24 10H20a2 2 0 0 1 1.94 2.5l-1.55 6a2 2 0 0 1-1.94 1.5H4a2 2 0 0 '
+    '1-2-2V5c0-1.1.9-2 2-2h3.93a2 2 0 0 1 1.66.9l.82 1.2a2 2 0 0 0 1.66.9H18a2 2 0 0 1 2 2v2"/>'
+    '<circle cx="14" cy="15" r="1"/></svg>'
+)
+
+WIDGETS = {
+    "QDropButton": lambda svg: QDropButton("Text", svg, svg, svg),
+    "QIconSvg": QIconSvg,
+    "QSvgButton": QSvgButton,
+    "QSvgButtonIcon": QSvgButtonIcon,
+    "SVGRenderRadioButton": SVGRenderRadioButton,
+    "SVGRenderButton": SVGRenderButton,
+    "SVGRenderIcon": SVGRenderIcon,
+}
+
+GRID_COLUMNS = 20
+CELL = (60, 40)
+
+BENCHMARKS = ("construct", "storm", "get_color", "svg_to_pixmap", "theme_switch")
+
+
+def theme(icon: str, hover: str, pressed: str) -> str:
+    names = ", ".join(WIDGETS)
+    return (
+        f"{names} {{ icon-color: {icon}; color: {icon}; }}\n"
+        + "".join(f"{name}:hover {{ icon-color: {hover}; }}\n" for name in WIDGETS)
+        + "".join(f"{name}:pressed {{ icon-color: {pressed}; }}\n" for name in WIDGETS)
+    )
+
+
+THEMES = (theme("#ccd5e1", "#496ef6", "#3276c3"), theme("#1e293b", "#f59e0b", "#b45309"))
+
+
+def large_style_sheet(rules: int) -> str:
+    """A stylesheet of the given number of rules with the widget rules at the end."""
+    filler = "".join(
+        f"#widget{i}, QLabel#label{i}:hover {{ color: #{i % 0xffffff:06x}; icon-color: #{i % 0xffffff:06x}; "
+        f"padding: {i % 10}px; border: 1px solid transparent; }}\n"
+        for i in range(rules)
+    )
+    return filler + THEMES[0]
+
+
+def reset_caches():
+    icon_cache.clear()
+    get_color.cache_clear()
+    compile_style_sheet.cache_clear()
+    style_cache.invalidate()
+
+
+def drain(app: QApplication):
+    """Process events until every scheduled icon refresh is done."""
+    app.processEvents()
+    while theme_coordinator.scheduled or polish_scheduler.scheduled or state_coalescer.scheduled:
+        app.processEvents()
+
+
+def count_calls(run: Callable, names) -> dict:
+    """Run once with instrumentation on and return how often each of the widget methods in names was called."""
+    render_stats.reset()
+    render_stats.enable()
+    try:
+        run()
+    finally:
+        render_stats.disable()
+    counts = dict.fromkeys(names, 0)
+    for counter in render_stats.calls.values():
+        for name in names:
+            counts[name] += counter[name]
+    render_stats.reset()
+    return counts
+
+
+def measure(run: Callable[[], Optional[float]], repeat: int, setup: Optional[Callable] = None) -> dict:
+    """Time run() repeat times. run() may return its own duration to leave out its preparation."""
+    runs = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        gc.collect()
+        start = time.perf_counter()
+        elapsed = run()
+        runs.append(elapsed if elapsed is not None else time.perf_counter() - start)
+    return {"min": min(runs), "median": statistics.median(runs), "mean": statistics.fmean(runs), "runs": runs}
+
+
+def result(benchmark: str, timing: dict, **params) -> dict:
+    return {"benchmark": benchmark, "params": params, **timing}
+
+
+def add_widget(container: QWidget, widgets: list, widget: QWidget):
+    """Place the widget in a grid cell of its own, overlapping widgets would repaint each other."""
+    widget.setParent(container)
+    widget.setGeometry((len(widgets) % GRID_COLUMNS) * CELL[0], (len(widgets) // GRID_COLUMNS) * CELL[1], *CELL)
+    widgets.append(widget)
+
+
+def create_widgets(name: str, svg: str, count: int, style_sheet: str):
+    container = QWidget()
+    container.setStyleSheet(style_sheet)
+    container.resize(GRID_COLUMNS * CELL[0], 800)
+    widgets = []
+    for _ in range(count):
+        add_widget(container, widgets, WIDGETS[name](svg))
+    return container, widgets
+
+
+def bench_construct(app, svg, counts, repeat):
+    results = []
+    for name in WIDGETS:
+        for count in counts:
+            phases = {"construct": [], "show": []}
+
+            def run():
+                start = time.perf_counter()
+                container, widgets = create_widgets(name, svg, count, THEMES[0])
+                created = time.perf_counter()
+                container.show()
+                drain(app)
+                shown = time.perf_counter()
+                phases["construct"].append(created - start)
+                phases["show"].append(shown - created)
+                container.close()
+                return shown - start
+
+            timing = measure(run, repeat, reset_caches)
+            results.append(result("construct", {**timing, **phases}, widget=name, count=count))
+    return results
+
+
+def bench_storm(app, svg, count, rounds, repeat):
+    pos = QPointF(2, 2)
+    enter = QEnterEvent(pos, pos, pos)
+    leave = QEvent(QEvent.Type.Leave)
+    press = QMouseEvent(QEvent.Type.MouseButtonPress, pos, pos, Qt.MouseButton.LeftButton,
+                        Qt.MouseButton.LeftButton, Qt.KeyboardModifier.NoModifier)
+    release = QMouseEvent(QEvent.Type.MouseButtonRelease, pos, pos, Qt.MouseButton.LeftButton,
+                          Qt.MouseButton.NoButton, Qt.KeyboardModifier.NoModifier)
+    events = (enter, press, release, leave)
+
+    results = []
+    for name, coalesce in itertools.product(WIDGETS, (False, True)):
+        container, widgets = create_widgets(name, svg, count, THEMES[0])
+        for widget in widgets:
+            widget.setHoverCoalescing(coalesce)
+        container.show()
+        drain(app)
+
+        def run():
+            for _ in range(rounds):
+                for widget in widgets:
+                    for event in events:
+                        QApplication.sendEvent(widget, event)
+            # apply the coalesced states now instead of waiting for the frame timer
+            state_coalescer.flush()
+            drain(app)
+
+        timing = measure(run, repeat)
+        timing["per_event"] = timing["median"] / (rounds * count * len(events))
+        timing["calls"] = count_calls(run, ("applyState", "showIcon"))
+        results.append(result("storm", timing, widget=name, count=count, rounds=rounds, coalesce=coalesce))
+        container.close()
+    return results
+
+
+def bench_get_color(rules_list, lookups, repeat):
+    results = []
+    states = [dict(), dict(hover=True), dict(pressed=True), dict(checked=True)]
+    for rules in rules_list:
+        style_sheet = large_style_sheet(rules)
+
+        def cold():
+            get_color.cache_clear()
+            compile_style_sheet.cache_clear()
+            for name in WIDGETS:
+                for state in states:
+                    get_color(name, style_sheet, **state)
+
+        def warm():
+            for _ in range(lookups):
+                for state in states:
+                    get_color("SVGRenderIcon", style_sheet, **state)
+
+        results.append(result("get_color", measure(cold, repeat), mode="cold", rules=rules))
+        cold()
+        timing = measure(warm, repeat)
+        timing["per_lookup"] = timing["median"] / (lookups * len(states))
+        results.append(result("get_color", timing, mode="warm", rules=rules, lookups=lookups))
+    return results
+
+
+def bench_svg_to_pixmap(svg, sizes, dprs, iterations, repeat):
+    results = []
+    for size in sizes:
+        for dpr in dprs:
+            def mask():
+                for _ in range(iterations):
+                    render_svg_mask(svg, size, size, dpr)
+
+            def render():
+                for _ in range(iterations):
+                    svg_to_pixmap(svg, size, size, "#496ef6", dpr)
+
+            def cached():
+                for _ in range(iterations):
+                    cached_svg_pixmap(svg, size, size, "#496ef6", dpr)
+
+            for mode, run in (("mask", mask), ("render", render), ("cached", cached)):
+                timing = measure(run, repeat)
+                timing["per_icon"] = timing["median"] / iterations
+                results.append(result("svg_to_pixmap", timing, mode=mode, size=size, dpr=dpr, iterations=iterations))
+    return results
+
+
+def bench_theme_switch(app, svg, count, repeat):
+    results = []
+    widgets = []
+    container = QWidget()
+    container.setStyleSheet(THEMES[0])
+    container.resize(GRID_COLUMNS * CELL[0], 800)
+    for name in WIDGETS:
+        for _ in range(count):
+            add_widget(container, widgets, WIDGETS[name](svg))
+    container.show()
+    drain(app)
+
+    switches = itertools.count(1)
+
+    def style_sheet():
+        container.setStyleSheet(THEMES[next(switches) % 2])
+        drain(app)
+
+    palettes = (QPalette(QColor("#1e293b")), QPalette(QColor("#f8fafc")))
+
+    def palette():
+        app.setPalette(palettes[next(switches) % 2])
+        drain(app)
+
+    for mode, run in (("style_sheet", style_sheet), ("palette", palette)):
+        results.append(result("theme_switch", measure(run, repeat), mode=mode, widgets=len(widgets)))
+    container.close()
+    return results
+
+
+def environment() -> dict:
+    return {
+        "python": platform.python_version(),
+        "pyside6": PySide6.__version__,
+        "qt": qVersion(),
+        "platform": platform.platform(),
+        "qpa": QApplication.platformName(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def run_benchmarks(args) -> dict:
+    app = QApplication.instance() or QApplication([])
+    with tempfile.TemporaryDirectory() as tmp:
+        svg = os.path.join(tmp, "icon.svg")
+        with open(svg, "w", encoding="utf-8") as f:
+            f.write(SVG)
+
+        results = []
+        if "construct" in args.only:
+            results += bench_construct(app, svg, args.counts, args.repeat)
+        if "storm" in args.only:
+            results += bench_storm(app, svg, args.storm_widgets, args.storm_rounds, args.repeat)
+        if "get_color" in args.only:
+            results += bench_get_color(args.rules, args.lookups, args.repeat)
+        if "svg_to_pixmap" in args.only:
+            results += bench_svg_to_pixmap(svg, args.sizes, args.dprs, args.iterations, args.repeat)
+        if "theme_switch" in args.only:
+            results += bench_theme_switch(app, svg, args.theme_widgets, args.repeat)
+
+    return {"environment": environment(), "results": results}
+
+
+def result_name(entry: dict) -> str:
+    return " ".join([entry["benchmark"]] + [f"{k}={v}" for k, v in sorted(entry["params"].items())])
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> List[str]:
+    """Describe every result whose median is more than threshold times the baseline median."""
+    old = {result_name(entry): entry["median"] for entry in baseline["results"]}
+    regressions = []
+    for entry in results["results"]:
+        name = result_name(entry)
+        before = old.get(name)
+        if before and entry["median"] > before * threshold:
+            regressions.append(f"{name}: {before * 1000:.2f} ms -> {entry['median'] * 1000:.2f} ms")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m pyside6_svg_widgets.benchmark",
+                                     description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--output", help="file the JSON results are written to, stdout by default")
+    parser.add_argument("--only", nargs="+", choices=BENCHMARKS, default=list(BENCHMARKS), help="benchmarks to run")
+    parser.add_argument("--repeat", type=int, default=3, help="runs of every benchmark")
+    parser.add_argument("--counts", type=int, nargs="+", default=[1000, 10000], help="widgets constructed per class")
+    parser.add_argument("--storm-widgets", type=int, default=200, help="widgets per class in the event storm")
+    parser.add_argument("--storm-rounds", type=int, default=20, help="enter/press/release/leave rounds per widget")
+    parser.add_argument("--rules", type=int, nargs="+", default=[100, 1000, 10000], help="stylesheet sizes")
+    parser.add_argument("--lookups", type=int, default=10000, help="warm get_color lookups per state")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[16, 24, 32, 64, 128, 256], help="icon sizes")
+    parser.add_argument("--dprs", type=float, nargs="+", default=[1.0, 2.0], help="device pixel ratios")
+    parser.add_argument("--iterations", type=int, default=100, help="icons rendered per size")
+    parser.add_argument("--theme-widgets", type=int, default=200, help="widgets per class in the theme switch")
+    parser.add_argument("--baseline", help="earlier JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=1.2, help="slowdown factor reported as a regression")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args)
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for line in regressions:
+            print(f"Slower: {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,44 @@
+"""
+Pack a directory of SVG icons into one bundle file.
+
+    python -m pyside6_svg_widgets.bundle icons/ icons.svgbundle --normalize
+
+Open it with QAbstract.load_bundle("icons.svgbundle") and pass "bundle:name" wherever a widget
+takes an SVG path; name is the path below the directory without ".svg", e.g. "bundle:arrows/left".
+"""
+import argparse
+import os
+import sys
+from typing import Dict, List, Optional
+
+from .QAbstract import SvgBundle
+from .bake import find_svgs
+
+
+def bundle_name(svg_dir: str, path: str) -> str:
+    name = os.path.relpath(path, svg_dir).replace(os.sep, "/")
+    return name[:-len(".svg")] if name.lower().endswith(".svg") else name
+
+
+def read_svgs(svg_dir: str) -> Dict[str, str]:
+    svgs = {}
+    for path in find_svgs(svg_dir):
+        with open(path, encoding="utf-8") as f:
+            svgs[bundle_name(svg_dir, path)] = f.read()
+    return svgs
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m pyside6_svg_widgets.bundle", description=__doc__.strip().split("\n")[0])
+    parser.add_argument("svg_dir", help="directory searched recursively for .svg files")
+    parser.add_argument("out_file", help="bundle file to write")
+    parser.add_argument("--normalize", action="store_true", help="store the SVGs normalized, as the widgets load them")
+    args = parser.parse_args(argv)
+
+    count = SvgBundle.write(args.out_file, read_svgs(args.svg_dir), args.normalize)
+    print(f"Packed {count} SVGs into {args.out_file}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,45 @@
+import pytest
+
+from pyside6_svg_widgets import QAbstract
+from pyside6_svg_widgets.QAbstract import SvgBundle, icon_key, load_stored_pixmap, load_bundle, unload_bundles
+from pyside6_svg_widgets.bake import bake
+
+SVG = ('<?xml version="1.0"?>\n<svg xmlns="http://www.w3.org/2000/svg" width="24" height="24">'
+       '<rect x="4" y="4" width="16" height="16"/></svg>\n')
+
+
+@pytest.fixture
+def baked(qapp, tmp_path, monkeypatch):
+    svg_dir = tmp_path / "icons"
+    svg_dir.mkdir()
+    path = svg_dir / "square.svg"
+    path.write_text(SVG, encoding="utf-8")
+    out_dir = tmp_path / "baked"
+    assert bake(str(svg_dir), str(out_dir), [20], [1.0], ["#ff0000"], jobs=1) == 1
+    monkeypatch.setattr(QAbstract, "BAKED_ICONS_DIR", str(out_dir))
+    return str(path)
+
+
+def test_baked_icon_found_for_path(baked):
+    assert load_stored_pixmap(icon_key(baked, 20, 20, "#ff0000")) is not None
+
+
+def test_baked_icon_found_for_markup(baked):
+    assert load_stored_pixmap(icon_key(SVG, 20, 20, "#ff0000")) is not None
+    interned = QAbstract.svg_pool.intern(SVG)
+    assert interned != SVG
+    assert load_stored_pixmap(icon_key(interned, 20, 20, "#ff0000")) is not None
+
+
+def test_baked_icon_found_for_bundle_reference(baked, tmp_path):
+    bundle = tmp_path / "icons.svgbundle"
+    SvgBundle.write(str(bundle), {"square": SVG})
+    load_bundle(str(bundle))
+    try:
+        assert load_stored_pixmap(icon_key("bundle:square", 20, 20, "#ff0000")) is not None
+    finally:
+        unload_bundles()
+
+
+def test_other_color_is_not_baked(baked):
+    assert load_stored_pixmap(icon_key(SVG, 20, 20, "#00ff00")) is None
@@ -0,0 +1,45 @@
+import pytest
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QStandardItem, QStandardItemModel
+from PySide6.QtWidgets import QStyle, QStyleOptionViewItem
+
+from pyside6_svg_widgets.QAbstract import SvgItemDelegate
+
+
+@pytest.fixture
+def item(qapp):
+    model = QStandardItemModel()
+    model.appendRow(QStandardItem("item"))
+    return model, model.index(0, 0)
+
+
+def item_state(index, state, checked=False):
+    if checked:
+        index.model().setData(index, Qt.CheckState.Checked, Qt.ItemDataRole.CheckStateRole)
+    option = QStyleOptionViewItem()
+    option.state = state
+    return SvgItemDelegate().itemState(option, index)
+
+
+def test_pressed_wins_over_hover(item):
+    _, index = item
+    state = QStyle.StateFlag.State_Sunken | QStyle.StateFlag.State_MouseOver
+    assert item_state(index, state) == "pressed"
+
+
+def test_pressed_wins_over_checked(item):
+    _, index = item
+    state = QStyle.StateFlag.State_Sunken | QStyle.StateFlag.State_Selected | QStyle.StateFlag.State_MouseOver
+    assert item_state(index, state, checked=True) == "pressed"
+
+
+def test_checked_and_selected_win_over_hover(item):
+    _, index = item
+    assert item_state(index, QStyle.StateFlag.State_Selected | QStyle.StateFlag.State_MouseOver) == "checked"
+    assert item_state(index, QStyle.StateFlag.State_MouseOver, checked=True) == "checked"
+
+
+def test_hover_and_normal(item):
+    _, index = item
+    assert item_state(index, QStyle.StateFlag.State_MouseOver) == "hover"
+    assert item_state(index, QStyle.StateFlag.State_None) == "normal"
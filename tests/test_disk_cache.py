@@ -0,0 +1,86 @@
+import os
+
+from PySide6.QtGui import QColor, QImage
+
+from pyside6_svg_widgets.QAbstract import DiskIconCache, icon_key
+
+SVG = '<svg xmlns="http://www.w3.org/2000/svg" width="24" height="24"><rect width="24" height="24"/></svg>'
+
+
+def image(width, color="#ff0000"):
+    result = QImage(width, 8, QImage.Format.Format_ARGB32_Premultiplied)
+    result.fill(QColor(color))
+    return result
+
+
+def key(width):
+    return icon_key(SVG, width, 8, "#ff0000")
+
+
+def test_round_trip_survives_reopening(qapp, tmp_path):
+    path = str(tmp_path / "icons.cache")
+    cache = DiskIconCache(path)
+    cache.put(key(8), image(8))
+    cache.close()
+
+    cache = DiskIconCache(path)
+    try:
+        assert key(8) in cache
+        loaded = cache.get(key(8))
+        assert (loaded.width(), loaded.height()) == (8, 8)
+        assert loaded.pixelColor(3, 3).name() == "#ff0000"
+        assert cache.get(key(9)) is None
+    finally:
+        cache.close()
+
+
+def test_other_version_is_discarded(qapp, tmp_path):
+    path = str(tmp_path / "icons.cache")
+    cache = DiskIconCache(path)
+    cache.put(key(8), image(8))
+    cache.close()
+
+    with open(path, "r+b") as f:
+        f.write(DiskIconCache.HEADER.pack(DiskIconCache.MAGIC, DiskIconCache.VERSION + 1, 0))
+
+    cache = DiskIconCache(path)
+    try:
+        assert len(cache) == 0
+        assert cache.size == DiskIconCache.HEADER.size
+    finally:
+        cache.close()
+
+
+def test_truncated_record_is_dropped(qapp, tmp_path):
+    path = str(tmp_path / "icons.cache")
+    cache = DiskIconCache(path)
+    cache.put(key(8), image(8))
+    complete = cache.size
+    cache.put(key(9), image(9))
+    cache.close()
+
+    with open(path, "r+b") as f:
+        f.truncate(os.path.getsize(path) - 10)
+
+    cache = DiskIconCache(path)
+    try:
+        assert key(8) in cache and key(9) not in cache
+        assert cache.size == complete
+        assert cache.get(key(8)).pixelColor(0, 0).name() == "#ff0000"
+    finally:
+        cache.close()
+
+
+def test_compaction_keeps_recently_used_records(qapp, tmp_path):
+    path = str(tmp_path / "icons.cache")
+    cache = DiskIconCache(path, max_bytes=1500)
+    try:
+        for width in range(8, 14):
+            cache.put(key(width), image(width))
+
+        assert cache.size <= 1500
+        assert key(13) in cache
+        assert key(8) not in cache
+        assert cache.get(key(13)).width() == 13
+    finally:
+        cache.close()
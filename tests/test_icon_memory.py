@@ -0,0 +1,69 @@
+import pytest
+
+from pyside6_svg_widgets import QAbstract
+from pyside6_svg_widgets.QAbstract import IconCache, IconMemory, IconStateTable, cached_svg_pixmap, icon_cache
+
+SVG = '<svg xmlns="http://www.w3.org/2000/svg" width="24" height="24"><circle cx="12" cy="12" r="8"/></svg>'
+COLORS = {"normal": "#ff0000", "hover": "#00ff00", "pressed": "#0000ff"}
+
+
+class Widget:
+    svg_path = SVG
+
+    def objectName(self):
+        return "widget"
+
+
+@pytest.fixture
+def memory(monkeypatch):
+    memory = IconMemory()
+    monkeypatch.setattr(QAbstract, "icon_memory", memory)
+    return memory
+
+
+@pytest.fixture
+def table(qapp):
+    icon_cache.clear()
+    table = IconStateTable()
+    table.colors = dict(COLORS)
+    table.built = True
+    return table
+
+
+def track_all(memory, table, widget):
+    for state, color in COLORS.items():
+        pixmap = cached_svg_pixmap(SVG, 16, 16, color)
+        table.icons[state] = pixmap
+        memory.track(table, widget, state, pixmap)
+    return IconCache.pixmap_bytes(pixmap)
+
+
+def test_evict_keeps_the_shown_icon_and_frees_the_cache(memory, table):
+    widget = Widget()
+    size = track_all(memory, table, widget)
+    table.current = COLORS["normal"]
+    evicted = cached_svg_pixmap(SVG, 16, 16, COLORS["hover"]).cacheKey()
+
+    memory.setMaxBytes(size)
+
+    assert set(table.icons) == {"normal", "pressed"}
+    assert memory.bytes == 2 * size
+    assert not icon_cache.holds(evicted)
+    assert len(icon_cache) == 2
+
+
+def test_select_touches_the_shown_state(memory, table):
+    widget = Widget()
+    size = track_all(memory, table, widget)
+    table.current = COLORS["normal"]
+    # showing normal again changes nothing on screen but makes it the most recently used
+    assert table.select(widget, "normal") is None
+    assert list(memory.entries)[-1] == (id(table), "normal")
+
+
+def test_report_counts_shared_pixmaps_once(memory, table):
+    widget = Widget()
+    size = track_all(memory, table, widget)
+    report = memory.report()
+    assert report["bytes"] == 3 * size
+    assert report["total_bytes"] == 3 * size
@@ -0,0 +1,38 @@
+from PySide6.QtWidgets import QWidget
+
+from pyside6_svg_widgets.QAbstract import QIconSvg, StyleIndex, get_effective_properties, style_state
+
+STYLE = """
+QIconSvg { icon-color: #111111; color: #222222; }
+QIconSvg:hover { /* icon-color: #333333; */ }
+QIconSvg:checked, QIconSvg:pressed { icon-color: #444444; }
+"""
+
+
+def test_index_keeps_pseudo_states_apart():
+    index = StyleIndex(STYLE)
+    assert index.properties("QIconSvg") == {"icon-color": "#111111", "color": "#222222"}
+    assert index.value("QIconSvg", "hover") == "#333333"
+    assert index.value("QIconSvg", "checked") == index.value("QIconSvg", "pressed") == "#444444"
+    assert index.value("QIconSvg", "hover", "color") is None
+    assert index.properties("QSvgButton") == {}
+
+
+def test_state_precedence():
+    assert style_state() == "normal"
+    assert style_state(pressed=True) == "pressed"
+    assert style_state(pressed=True, checked=True) == "checked"
+    assert style_state(hover=True, pressed=True, checked=True) == "hover"
+
+
+def test_nearest_ancestor_wins_per_state(qapp):
+    parent = QWidget()
+    parent.setStyleSheet(STYLE)
+    child = QWidget(parent)
+    child.setStyleSheet("QIconSvg:hover { icon-color: #555555; }")
+    icon = QIconSvg("", parent=child)
+
+    properties = get_effective_properties(icon)
+    assert properties["icon-color"] == {"normal": "#111111", "hover": "#555555",
+                                        "checked": "#444444", "pressed": "#444444"}
+    assert properties["color"] == {"normal": "#222222", "hover": None, "checked": None, "pressed": None}
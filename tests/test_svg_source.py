@@ -0,0 +1,73 @@
+import pytest
+
+from pyside6_svg_widgets import QAbstract
+from pyside6_svg_widgets.QAbstract import SIZE, SvgBundle, SvgSourcePool, load_bundle, normalize_svg, unload_bundles
+
+SVG = '<svg xmlns="http://www.w3.org/2000/svg" width="24" height="24"><rect width="24" height="24"/></svg>'
+
+
+@pytest.fixture
+def bundle(tmp_path):
+    path = str(tmp_path / "icons.svgbundle")
+    SvgBundle.write(path, {"square": SVG, "nested/circle": SVG.replace("rect", "circle")})
+    opened = load_bundle(path)
+    yield opened
+    unload_bundles()
+
+
+def test_normalize_sets_size_and_keeps_view_box():
+    assert normalize_svg(SVG) == (f'<svg width="{SIZE}" height="{SIZE}" viewBox="0 0 24 24" '
+                                  'xmlns="http://www.w3.org/2000/svg"><rect width="24" height="24"/></svg>')
+    with_view_box = '<svg width="24px" height="24" viewBox="0 0 12 12"/>'
+    assert normalize_svg(with_view_box) == f'<svg width="{SIZE}" height="{SIZE}" viewBox="0 0 12 12"/>'
+
+
+def test_normalize_finds_the_root_after_the_prolog():
+    svg = '<?xml version="1.0"?>\n<!-- <svg width="1" height="1"> -->\n<!DOCTYPE svg>\n' + SVG
+    normalized = normalize_svg(svg)
+    assert normalized.startswith('<?xml version="1.0"?>\n<!-- <svg width="1" height="1"> -->')
+    assert f'width="{SIZE}" height="{SIZE}" viewBox="0 0 24 24"' in normalized
+
+
+@pytest.mark.parametrize("svg", [
+    '<svg width="100%" height="24"/>',
+    '<svg viewBox="0 0 24 24"/>',
+    '<html><svg width="24" height="24"/></html>',
+])
+def test_normalize_leaves_other_svgs_alone(svg):
+    assert normalize_svg(svg) == svg
+
+
+def test_pool_interns_equal_strings_and_drops_the_oldest():
+    pool = SvgSourcePool(max_entries=4)
+    first = pool.intern(SVG)
+    assert pool.intern("".join(SVG)) is first
+    assert pool.digest(first) == pool.digest(SVG)
+    for size in range(10):
+        pool.intern(f'<svg width="{size}" height="{size}"/>')
+    assert len(pool) == 4
+
+
+def test_bundle_lookup(bundle):
+    assert len(bundle) == 2
+    assert bundle.names() == ["nested/circle", "square"]
+    assert "square" in bundle and "missing" not in bundle
+    assert bundle.get("square") == SVG
+    assert bundle.get("missing") is None
+    assert QAbstract.svg_pool.intern("bundle:square") == normalize_svg(SVG)
+
+
+def test_unknown_bundle_name_raises(bundle):
+    with pytest.raises(KeyError, match="missing"):
+        QAbstract.svg_pool.intern("bundle:missing")
+
+
+def test_normalized_bundle_is_not_normalized_again(tmp_path, monkeypatch):
+    path = str(tmp_path / "icons.svgbundle")
+    SvgBundle.write(path, {"square": SVG}, normalize=True)
+    load_bundle(path)
+    monkeypatch.setattr(QAbstract, "normalize_svg", lambda svg: pytest.fail("normalized again"))
+    try:
+        assert SvgSourcePool().intern("bundle:square") == normalize_svg(SVG)
+    finally:
+        unload_bundles()